@@ -0,0 +1,109 @@
+"""The NumPy analytics engine against the optimized SQL, for correctness and latency.
+
+Loads synthetic data (unless ``--skip-load``), publishes it so the views and
+``state_profile`` exist, builds ``harvest_match.engine.AnalyticsEngine`` from
+the database and checks every result with ``engine.verify``. Then times each
+query both ways: the median of ``--runs`` warm SQL executions against the
+median engine answer. Also times a sweep of query 4's thresholds through
+``AnalyticsEngine.resilient_crops``. Exits non-zero when any result differs.
+
+    PGHOST=localhost PGSSLMODE=disable python -m benchmarks.engine --scale 10
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.queries import elapsed_ms, prepare
+from harvest_match.db import connect
+from harvest_match.engine import EXTREMES, AnalyticsEngine, Extremes, verify
+from harvest_match.publish import publish
+from harvest_match.synthetic import load_synthetic
+from queries import optimized_queries
+
+
+def engine_us(engine, name, state, runs):
+    """Median engine answer time in microseconds."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        engine.query(name, state)
+        times.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(times)
+
+
+def sweep_us(engine):
+    """Median leaderboard time in microseconds over a grid of query 4 thresholds."""
+    grid = [
+        Extremes(pollution=EXTREMES.pollution * scale, temp=temp, precip=precip, min_score=min_score)
+        for scale, temp, precip, min_score in itertools.product(
+            (0.5, 0.75, 1, 1.25), ((20, 80), (30, 70), (40, 60)),
+            ((0.01, 0.16), (0.05, 0.12)), (1, 2, 3))
+    ]
+    times = []
+    for extremes in grid:
+        start = time.perf_counter()
+        engine.resilient_crops(extremes)
+        times.append((time.perf_counter() - start) * 1e6)
+    return len(grid), statistics.median(times)
+
+
+def latencies(conn, engine, state, runs):
+    results = {}
+    with conn.cursor() as cur:
+        for n in range(1, 11):
+            name = f'query{n}'
+            sql = prepare(getattr(optimized_queries, name), state)
+            elapsed_ms(cur, sql)
+            sql_ms = statistics.median([elapsed_ms(cur, sql)[0] for _ in range(runs)])
+            results[name] = {'sql_ms': sql_ms, 'engine_us': engine_us(engine, name, state, runs * 100)}
+    conn.rollback()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--runs', type=int, default=5, help='warm SQL runs per query')
+    parser.add_argument('--state', default='IOWA', help="value for query1's state placeholder")
+    parser.add_argument('--skip-load', action='store_true', help='reuse the data already loaded')
+    parser.add_argument('--json', help='also write the numbers to this file')
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if not args.skip_load:
+            load_synthetic(conn, scale=args.scale, seed=args.seed)
+            publish(conn)
+        start = time.perf_counter()
+        engine = AnalyticsEngine.from_database(conn)
+        build_s = time.perf_counter() - start
+        differences = verify(engine, conn)
+        timings = latencies(conn, engine, args.state, args.runs)
+        sweep = sweep_us(engine)
+    finally:
+        conn.close()
+
+    print(f"engine built in {build_s:.2f}s")
+    print(f"{'query':<8} {'SQL ms':>10} {'engine us':>10} {'differences':>12}")
+    for name, timing in timings.items():
+        print(f"{name:<8} {timing['sql_ms']:>10.2f} {timing['engine_us']:>10.2f} "
+              f"{len(differences[name]):>12}")
+    print(f"query4 sweep: {sweep[0]} threshold sets, {sweep[1]:.2f} us median")
+    for found in differences.values():
+        for difference in found[:5]:
+            print(f"  {difference}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'build_s': build_s, 'queries': timings, 'sweep_us': sweep[1],
+                       'differences': differences}, f, indent=2)
+    if any(differences.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""Benchmark ``queries/before_optimization_queries.py`` against ``optimized_queries.py``.
+
+Loads ``harvest_match.synthetic`` data at ``--scale`` into a local PostgreSQL
+(``PG*`` environment variables, see ``harvest_match.db``), then runs every
+``queryN`` from both modules and records:
+
+* cold latency, when the data can actually be evicted first (see below);
+  otherwise it is reported as unavailable
+* first-run latency: the first run on a fresh connection, which still finds
+  the data in shared buffers and the OS page cache, so it is not a cold read
+* warm latency: the median of repeated runs
+* the ``EXPLAIN (ANALYZE, BUFFERS)`` plan
+
+A cold run needs help from outside the database. ``--cold-command`` runs a
+shell command before each query, typically a server restart plus a dropped
+page cache, and waits for the server to come back::
+
+    --cold-command 'sudo systemctl restart postgresql && sync && echo 3 | sudo tee /proc/sys/vm/drop_caches'
+
+Without it, if the ``pg_buffercache`` extension is installed with
+``pg_buffercache_evict`` (PostgreSQL 17+), the database's shared buffers are
+evicted instead; the OS page cache stays warm, so those numbers are labelled
+"shared buffers evicted" and sit between a true cold read and the first run.
+
+The unoptimized queries run with the ``harvest_match.migrations`` indexes and
+views dropped; the optimized ones after ``apply_migrations``,
+``build_state_profile`` and ``build_best_conditions``, whose one-off cost is
+reported separately.
+
+Results go to a JSON report and a markdown summary. ``--baseline`` compares
+warm latencies with an earlier JSON report and exits non-zero on regressions.
+
+    PGHOST=localhost PGSSLMODE=disable python -m benchmarks.queries --scale 1 \\
+        --json bench.json --markdown bench.md
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import psycopg2
+
+from harvest_match.conditions import build_best_conditions
+from harvest_match.db import connect
+from harvest_match.migrations import apply_migrations, drop_migrations
+from harvest_match.profiles import build_state_profile
+from harvest_match.synthetic import load_synthetic
+
+VARIANTS = {
+    'before': 'queries.before_optimization_queries',
+    'optimized': 'queries.optimized_queries',
+}
+QUERY_NUMBERS = range(1, 11)
+# How long to wait for the server after --cold-command
+RESTART_TIMEOUT_S = 120
+
+HAS_EVICT_SQL = "SELECT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'pg_buffercache_evict')"
+EVICT_SQL = """
+SELECT count(pg_buffercache_evict(bufferid))
+FROM pg_buffercache
+WHERE reldatabase = (SELECT oid FROM pg_database WHERE datname = current_database())
+"""
+
+COLD_METHODS = {
+    'restart': 'cold: --cold-command before each query',
+    'evict': 'shared buffers evicted with pg_buffercache_evict; OS page cache still warm',
+    None: 'unavailable: pass --cold-command or install pg_buffercache (PostgreSQL 17+)',
+}
+
+
+def split_statements(sql):
+    return [s.strip() for s in sql.split(';') if re.sub(r'/\*.*?\*/', '', s, flags=re.S).strip()]
+
+
+def prepare(sql, state):
+    """Fill the state placeholder (quoted either way in the two modules)."""
+    return sql.replace("'STATE NAME'", f"'{state}'").replace('"STATE NAME"', f"'{state}'")
+
+
+def elapsed_ms(cur, sql):
+    start = time.perf_counter()
+    cur.execute(sql)
+    rows = cur.fetchall() if cur.description else []
+    return (time.perf_counter() - start) * 1000, len(rows)
+
+
+def plan_summary(plan):
+    top = plan[0]
+    return {
+        'execution_ms': top['Execution Time'],
+        'planning_ms': top['Planning Time'],
+        'shared_hit': top['Plan'].get('Shared Hit Blocks', 0),
+        'shared_read': top['Plan'].get('Shared Read Blocks', 0),
+    }
+
+
+def wait_for_server(timeout_s=RESTART_TIMEOUT_S):
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            return connect()
+        except psycopg2.OperationalError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def cold_method(cold_command):
+    if cold_command:
+        return 'restart'
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(HAS_EVICT_SQL)
+            return 'evict' if cur.fetchone()[0] else None
+    finally:
+        conn.close()
+
+
+def make_cold(method, cold_command):
+    """Return a callable that empties the caches before a cold run, or None."""
+    if method == 'restart':
+        def cold():
+            subprocess.run(cold_command, shell=True, check=True)
+            wait_for_server().close()
+    elif method == 'evict':
+        def cold():
+            conn = connect()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(EVICT_SQL)
+            finally:
+                conn.close()
+    else:
+        return None
+    return cold
+
+
+def cold_ms(read, timeout_s, cold):
+    cold()
+    conn = connect()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SET statement_timeout = {int(timeout_s * 1000)}")
+            return elapsed_ms(cur, read)[0]
+    finally:
+        conn.close()
+
+
+def benchmark_query(sql, runs, timeout_s, cold=None):
+    read = split_statements(sql)[-1]
+    cold_run_ms = None if cold is None else cold_ms(read, timeout_s, cold)
+    conn = connect()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SET statement_timeout = {int(timeout_s * 1000)}")
+            first_ms, rows = elapsed_ms(cur, read)
+            warm = [elapsed_ms(cur, read)[0] for _ in range(runs)]
+
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {read}")
+            plan = cur.fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        'cold_ms': cold_run_ms,
+        'first_ms': first_ms,
+        'warm_ms': statistics.median(warm),
+        'warm_runs_ms': warm,
+        'rows': rows,
+        **plan_summary(plan),
+        'plan': plan,
+    }
+
+
+def prepare_variant(variant):
+    """Drop or create the migrated objects and the rebuilt tables; returns the time in ms."""
+    conn = connect()
+    try:
+        if variant == 'before':
+            drop_migrations(conn)
+            return None
+        start = time.perf_counter()
+        apply_migrations(conn)
+        build_state_profile(conn)
+        build_best_conditions(conn)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        conn.close()
+
+
+def run(numbers, runs, state, timeout_s, cold=None):
+    results = []
+    migrate_ms = None
+    for variant, module_name in VARIANTS.items():
+        module = importlib.import_module(module_name)
+        migrate_ms = prepare_variant(variant) or migrate_ms
+        for n in numbers:
+            sql = prepare(getattr(module, f'query{n}'), state)
+            print(f"query{n} {variant} ...", flush=True)
+            try:
+                result = benchmark_query(sql, runs, timeout_s, cold)
+            except Exception as e:  # a failing query is reported, not fatal
+                result = {'error': str(e).strip()}
+            results.append({'query': f'query{n}', 'variant': variant, **result})
+    return results, migrate_ms
+
+
+def speedups(results):
+    by_key = {(r['query'], r['variant']): r for r in results}
+    out = {}
+    for query in dict.fromkeys(r['query'] for r in results):
+        before, optimized = by_key.get((query, 'before')), by_key.get((query, 'optimized'))
+        if before and optimized and 'error' not in before and 'error' not in optimized:
+            out[query] = {
+                'first': before['first_ms'] / optimized['first_ms'],
+                'warm': before['warm_ms'] / optimized['warm_ms'],
+            }
+            if before['cold_ms'] is not None and optimized['cold_ms'] is not None:
+                out[query]['cold'] = before['cold_ms'] / optimized['cold_ms']
+    return out
+
+
+def markdown(report):
+    meta = report['meta']
+    lines = [
+        f"# Query benchmark (scale {meta['scale']}, seed {meta['seed']}, {meta['runs']} warm runs)",
+        '',
+        f"Migrations and state_profile (paid once per load): {meta['migrate_ms'] or 0:,.1f} ms",
+        '',
+        f"Cold runs: {meta['cold']}",
+        '',
+        '| query | before cold ms | before first-run ms | before warm ms '
+        '| optimized cold ms | optimized first-run ms | optimized warm ms '
+        '| cold speedup | warm speedup | buffers hit/read (opt.) |',
+        '|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|',
+    ]
+    by_key = {(r['query'], r['variant']): r for r in report['results']}
+    for query in dict.fromkeys(r['query'] for r in report['results']):
+        b, o = by_key[(query, 'before')], by_key[(query, 'optimized')]
+
+        def cell(r, key):
+            if 'error' in r:
+                return 'error'
+            return 'n/a' if r[key] is None else f"{r[key]:,.1f}"
+
+        def speedup(kind):
+            speed = report['speedups'].get(query, {}).get(kind)
+            return '-' if speed is None else f'{speed:.1f}x'
+
+        buffers = '-' if 'error' in o else f"{o['shared_hit']}/{o['shared_read']}"
+        lines.append(
+            f"| {query} | {cell(b, 'cold_ms')} | {cell(b, 'first_ms')} | {cell(b, 'warm_ms')} "
+            f"| {cell(o, 'cold_ms')} | {cell(o, 'first_ms')} | {cell(o, 'warm_ms')} "
+            f"| {speedup('cold')} | {speedup('warm')} "
+            f"| {buffers} |"
+        )
+    errors = [r for r in report['results'] if 'error' in r]
+    if errors:
+        lines += ['', '## Errors', '']
+        lines += [f"- {r['query']} ({r['variant']}): {r['error'].splitlines()[0]}" for r in errors]
+    return '\n'.join(lines) + '\n'
+
+
+def regressions(report, baseline, tolerance):
+    old = {(r['query'], r['variant']): r for r in baseline['results'] if 'error' not in r}
+    found = []
+    for r in report['results']:
+        prev = old.get((r['query'], r['variant']))
+        if prev and 'error' not in r and r['warm_ms'] > prev['warm_ms'] * tolerance:
+            found.append(f"{r['query']} {r['variant']}: {prev['warm_ms']:.1f} -> {r['warm_ms']:.1f} ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--runs', type=int, default=5, help='warm runs per query')
+    parser.add_argument('--queries', type=int, nargs='*', default=list(QUERY_NUMBERS))
+    parser.add_argument('--state', default='IOWA', help="value for query1's state placeholder")
+    parser.add_argument('--timeout', type=float, default=300, help='statement timeout in seconds')
+    parser.add_argument('--skip-load', action='store_true', help='reuse the data already loaded')
+    parser.add_argument('--cold-command',
+                        help='shell command that empties the caches before each cold run, '
+                             'e.g. a server restart and a page cache drop')
+    parser.add_argument('--json', default='query_benchmark.json')
+    parser.add_argument('--markdown', default='query_benchmark.md')
+    parser.add_argument('--baseline', help='earlier JSON report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='warm latency ratio over the baseline that counts as a regression')
+    args = parser.parse_args()
+
+    if not args.skip_load:
+        conn = connect()
+        try:
+            load_synthetic(conn, scale=args.scale, seed=args.seed)
+        finally:
+            conn.close()
+
+    method = cold_method(args.cold_command)
+    cold = make_cold(method, args.cold_command)
+    results, migrate_ms = run(args.queries, args.runs, args.state, args.timeout, cold)
+    report = {
+        'meta': {
+            'scale': args.scale, 'seed': args.seed, 'runs': args.runs, 'state': args.state,
+            'migrate_ms': migrate_ms, 'cold': COLD_METHODS[method],
+            'started': datetime.datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+        'speedups': speedups(results),
+    }
+    with open(args.json, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    with open(args.markdown, 'w') as f:
+        f.write(markdown(report))
+    print(markdown(report))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f), args.tolerance)
+        if found:
+            print('Regressions:\n  ' + '\n  '.join(found))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark the yield unit conversion on a synthetic NASS-shaped frame.
+
+Compares the old row-wise ``DataFrame.apply`` against the mapped multiply in
+``harvest_match.transforms``. Both sides use the same per-crop bushel table, so the
+outputs are checked for equality as well as timed.
+
+    python -m benchmarks.unit_conversion --rows 5000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from harvest_match.transforms import BUSHEL_KG, UNIT_CONVERSIONS, yield_kg_per_acre
+
+CROP_UNITS = {
+    'BARLEY': 'BU / ACRE', 'CORN': 'BU / ACRE', 'OATS': 'BU / ACRE',
+    'SORGHUM': 'BU / ACRE', 'SOYBEANS': 'BU / ACRE', 'WHEAT': 'BU / ACRE',
+    'CANOLA': 'LB / ACRE', 'COTTON': 'LB / ACRE', 'SUNFLOWER': 'LB / ACRE',
+    'LENTILS': 'LB / ACRE', 'CHICKPEAS': 'LB / ACRE', 'BEANS': 'CWT / ACRE',
+    'HAY': 'TONS / ACRE', 'SUGARBEETS': 'TONS / ACRE', 'SUGARCANE': 'TONS / ACRE',
+}
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    crops = np.array(list(CROP_UNITS))
+    crop = crops[rng.integers(0, len(crops), rows)]
+    value = rng.uniform(1, 3000, rows).round(1).astype(str)
+    # NASS suppresses some values as "(D)"; they must come back NaN
+    value[rng.random(rows) < 0.02] = '(D)'
+    return pd.DataFrame({
+        'Commodity': crop,
+        'Unit': pd.Series(crop).map(CROP_UNITS).to_numpy(),
+        'Value': value,
+    })
+
+
+def rowwise(df):
+    df = df.assign(Value=pd.to_numeric(df['Value'], errors='coerce'))
+
+    def convert(row):
+        if pd.isnull(row['Value']) or row['Unit'] not in UNIT_CONVERSIONS:
+            return None
+        if row['Unit'] == 'BU / ACRE':
+            return row['Value'] * BUSHEL_KG.get(row['Commodity'], UNIT_CONVERSIONS['BU / ACRE'])
+        return row['Value'] * UNIT_CONVERSIONS[row['Unit']]
+
+    return df.apply(convert, axis=1)
+
+
+def vectorized(df):
+    return yield_kg_per_acre(df['Value'], df['Unit'], df['Commodity'])
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    out = fn(df)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--apply-rows', type=int, default=None,
+                        help='cap the row-wise baseline (it is slow); throughput is per row')
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    baseline_df = df if args.apply_rows is None else df.iloc[:args.apply_rows]
+
+    fast, fast_s = timed(vectorized, df)
+    slow, slow_s = timed(rowwise, baseline_df)
+
+    expected = pd.to_numeric(slow, errors='coerce')
+    np.testing.assert_allclose(fast.iloc[:len(baseline_df)].to_numpy(), expected.to_numpy())
+
+    slow_rate = len(baseline_df) / slow_s
+    fast_rate = len(df) / fast_s
+    print(f"row-wise apply : {len(baseline_df):>10,} rows  {slow_s:8.3f}s  {slow_rate:>14,.0f} rows/s")
+    print(f"mapped multiply: {len(df):>10,} rows  {fast_s:8.3f}s  {fast_rate:>14,.0f} rows/s")
+    print(f"speedup        : {fast_rate / slow_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
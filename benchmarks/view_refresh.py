@@ -0,0 +1,217 @@
+"""Total refresh cost of the materialized views, before and after consolidation.
+
+Queries 2, 3 and 4 used to build the same per-(year, state) aggregates under
+several names (``LEGACY_VIEWS`` below). This builds that set and then the
+current ``harvest_match.views`` registry over the same synthetic data, and
+reports per-view refresh time and size plus the totals. The current queries
+take those aggregates from ``state_year_climate``, which the load fills as the
+rows stream in, so they have no refresh cost left to measure here.
+
+    PGHOST=localhost PGSSLMODE=disable python -m benchmarks.view_refresh --scale 10
+"""
+
+import argparse
+import json
+import time
+
+from harvest_match.db import connect
+from harvest_match.migrations import apply_migrations, drop_migrations
+from harvest_match.synthetic import load_synthetic
+from harvest_match.views import MATERIALIZED_VIEWS
+
+_POLLUTION_BY_YEAR = """
+  SELECT
+    "Year" AS year,
+    UPPER("State") AS state,
+    AVG("CO Mean") + AVG("NO2 Mean") + AVG("SO2 Mean") + AVG("O3 Mean") AS pollution_score
+  FROM pollution_data
+  WHERE "Year" BETWEEN 2016 AND 2022
+  GROUP BY "Year", UPPER("State")
+"""
+
+_PRECIP_BY_YEAR = """
+  SELECT
+    EXTRACT(YEAR FROM start_date)::int AS year,
+    UPPER(state) AS state,
+    AVG(precipitation) AS avg_precip
+  FROM weather_events
+  WHERE start_date BETWEEN '2016-01-01' AND '2022-12-31'
+  GROUP BY EXTRACT(YEAR FROM start_date), UPPER(state)
+"""
+
+# The views as the optimized queries defined them before consolidation
+LEGACY_VIEWS = {
+    **{name: MATERIALIZED_VIEWS[name].query
+       for name in ('weather_avg_mv', 'crop_yearly_mv')},
+    'temp_label_mv': """
+SELECT
+  c.crop,
+  t.average_temp,
+  c.yield_kg_per_acre,
+  CASE NTILE(3) OVER (ORDER BY t.average_temp)
+    WHEN 1 THEN 'Low'
+    WHEN 2 THEN 'Mid'
+    ELSE 'High'
+  END AS temp_group
+FROM crop_data c
+JOIN temperature_data t
+  ON c.year = t.year AND UPPER(c.state) = UPPER(t.state)
+WHERE c.year BETWEEN 2016 AND 2022
+""",
+    'pollution_yearly_mv': """
+SELECT
+  "Year" AS year,
+  UPPER("State") AS state,
+  ROUND(AVG("CO Mean")::numeric, 4) AS avg_co,
+  ROUND(AVG("NO2 Mean")::numeric, 4) AS avg_no2,
+  ROUND(AVG("SO2 Mean")::numeric, 4) AS avg_so2,
+  ROUND(AVG("O3 Mean")::numeric, 4) AS avg_o3
+FROM pollution_data
+WHERE "Year" BETWEEN 2016 AND 2021
+GROUP BY "Year", UPPER("State")
+""",
+    'precip_yearly_mv': """
+SELECT
+  EXTRACT(YEAR FROM start_date)::int AS year,
+  UPPER(state) AS state,
+  ROUND(AVG(precipitation)::numeric, 2) AS avg_precipitation
+FROM weather_events
+WHERE start_date >= '2016-01-01' AND start_date < '2022-01-01'
+GROUP BY EXTRACT(YEAR FROM start_date), UPPER(state)
+""",
+    'temperature_yearly_mv': """
+SELECT
+  year,
+  UPPER(state) AS state,
+  ROUND(AVG(average_temp)::numeric, 2) AS avg_temp
+FROM temperature_data
+WHERE year BETWEEN 2016 AND 2021
+GROUP BY year, UPPER(state)
+""",
+    'pollution_label_mv': f"""
+WITH pollution_avg AS ({_POLLUTION_BY_YEAR})
+SELECT
+  c.crop,
+  p.pollution_score,
+  c.yield_kg_per_acre,
+  CASE NTILE(3) OVER (ORDER BY p.pollution_score)
+    WHEN 1 THEN 'Low'
+    WHEN 2 THEN 'Mid'
+    ELSE 'High'
+  END AS pollution_group
+FROM crop_data c
+JOIN pollution_avg p
+  ON c.year = p.year AND UPPER(c.state) = p.state
+WHERE c.year BETWEEN 2016 AND 2022
+""",
+    'precip_label_mv': f"""
+WITH yearly_precip AS ({_PRECIP_BY_YEAR})
+SELECT
+  c.crop,
+  y.avg_precip,
+  c.yield_kg_per_acre,
+  CASE NTILE(3) OVER (ORDER BY y.avg_precip)
+    WHEN 1 THEN 'Low'
+    WHEN 2 THEN 'Mid'
+    ELSE 'High'
+  END AS precip_group
+FROM crop_data c
+JOIN yearly_precip y
+  ON c.year = y.year AND UPPER(c.state) = y.state
+WHERE c.year BETWEEN 2016 AND 2022
+""",
+    'pollution_avg_by_year_state_mv': _POLLUTION_BY_YEAR.replace('pollution_score', 'pollution'),
+    'temperature_avg_by_year_state_mv': """
+SELECT
+  year,
+  UPPER(state) AS state,
+  AVG(average_temp) AS average_temp
+FROM temperature_data
+WHERE year BETWEEN 2016 AND 2022
+GROUP BY year, UPPER(state)
+""",
+    'precip_avg_by_year_state_mv': _PRECIP_BY_YEAR,
+    'state_avg_precip_mv': """
+SELECT
+  UPPER(state) AS state,
+  ROUND(AVG(precipitation)::numeric, 2) AS avg_precip
+FROM weather_events
+WHERE start_date BETWEEN '2016-01-01' AND '2022-12-31'
+GROUP BY UPPER(state)
+""",
+}
+
+
+def refresh_cost(cur, names):
+    """``{view: (refresh seconds, size in bytes)}``, refreshing in the given order."""
+    cost = {}
+    for name in names:
+        start = time.perf_counter()
+        cur.execute(f"REFRESH MATERIALIZED VIEW {name}")
+        elapsed = time.perf_counter() - start
+        cur.execute("SELECT pg_total_relation_size(%s::regclass)", (name,))
+        cost[name] = (elapsed, cur.fetchone()[0])
+    return cost
+
+
+def legacy_cost(conn):
+    drop_migrations(conn)
+    with conn.cursor() as cur:
+        for name, query in LEGACY_VIEWS.items():
+            cur.execute(f"CREATE MATERIALIZED VIEW {name} AS {query}")
+        cost = refresh_cost(cur, LEGACY_VIEWS)
+        for name in LEGACY_VIEWS:
+            cur.execute(f"DROP MATERIALIZED VIEW {name} CASCADE")
+    conn.commit()
+    return cost
+
+
+def current_cost(conn):
+    drop_migrations(conn)
+    apply_migrations(conn)
+    with conn.cursor() as cur:
+        cost = refresh_cost(cur, MATERIALIZED_VIEWS)
+    conn.commit()
+    return cost
+
+
+def report(results):
+    lines = []
+    for label, cost in results.items():
+        lines.append(f"{label}: {len(cost)} views")
+        lines.append(f"  {'view':<34} {'refresh s':>10} {'MB':>8}")
+        for name, (seconds, size) in cost.items():
+            lines.append(f"  {name:<34} {seconds:>10.2f} {size / 2**20:>8.2f}")
+        seconds = sum(s for s, _ in cost.values())
+        size = sum(b for _, b in cost.values())
+        lines.append(f"  {'total':<34} {seconds:>10.2f} {size / 2**20:>8.2f}")
+    before, after = (sum(s for s, _ in c.values()) for c in results.values())
+    lines.append(f"total refresh time {before:.2f}s -> {after:.2f}s ({after / max(before, 1e-9):.0%})")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-load', action='store_true', help='reuse the data already loaded')
+    parser.add_argument('--json', help='also write the numbers to this file')
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if not args.skip_load:
+            load_synthetic(conn, scale=args.scale, seed=args.seed)
+        results = {'legacy': legacy_cost(conn), 'consolidated': current_cost(conn)}
+    finally:
+        conn.close()
+
+    print(report(results))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({label: {name: {'refresh_s': s, 'bytes': b} for name, (s, b) in cost.items()}
+                       for label, cost in results.items()}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
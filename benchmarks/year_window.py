@@ -0,0 +1,106 @@
+"""Latency of the windowed queries as the year window grows.
+
+Loads synthetic data (unless ``--skip-load``), whose crop and temperature
+history spans decades, into the year-partitioned tables, publishes it, then
+renders each query that takes a window (``harvest_match.queryspec``) for
+windows of ``--sizes`` years ending at ``--last``. For each it reports the
+median of ``--runs`` warm executions and how many yearly partitions the plan
+scans out of those loaded, so latency can be read against the window rather
+than the total history.
+
+    PGHOST=localhost PGSSLMODE=disable python -m benchmarks.year_window --scale 10
+"""
+
+import argparse
+import json
+import statistics
+
+from benchmarks.queries import elapsed_ms
+from harvest_match.bulk_load import PARTITION_KEYS
+from harvest_match.db import connect
+from harvest_match.publish import publish
+from harvest_match.queryspec import QUERY_SPECS, render
+from harvest_match.synthetic import load_synthetic
+
+QUERIES = [name for name, spec in QUERY_SPECS.items() if spec.years is not None]
+
+
+def partitions(cur):
+    """``{partition: parent}`` for every partition of the partitioned tables."""
+    cur.execute(
+        "SELECT c.relname, p.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = ANY(%s)",
+        (list(PARTITION_KEYS),),
+    )
+    return dict(cur.fetchall())
+
+
+def scanned(node, names):
+    """Partitions among ``names`` read anywhere in an EXPLAIN JSON plan node."""
+    found = {node['Relation Name']} & names if 'Relation Name' in node else set()
+    for child in node.get('Plans', ()):
+        found |= scanned(child, names)
+    return found
+
+
+def measure(cur, sql, runs, names):
+    elapsed_ms(cur, sql)
+    warm_ms = statistics.median([elapsed_ms(cur, sql)[0] for _ in range(runs)])
+    cur.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+    return warm_ms, sorted(scanned(cur.fetchone()[0][0]['Plan'], names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--runs', type=int, default=5, help='warm runs per query and window')
+    parser.add_argument('--last', type=int, default=2021, help='last year of every window')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1, 2, 4, 8, 16, 32],
+                        help='window sizes in years')
+    parser.add_argument('--skip-load', action='store_true', help='reuse the data already loaded')
+    parser.add_argument('--json', help='also write the numbers to this file')
+    args = parser.parse_args()
+
+    conn = connect()
+    conn.autocommit = True
+    results = []
+    try:
+        if not args.skip_load:
+            load_synthetic(conn, scale=args.scale, seed=args.seed)
+            publish(conn)
+        with conn.cursor() as cur:
+            parents = partitions(cur)
+            for name in QUERIES:
+                for size in args.sizes:
+                    years = (args.last - size + 1, args.last)
+                    try:
+                        sql = render(name, years)
+                    except ValueError as e:
+                        results.append({'query': name, 'years': years, 'skipped': str(e)})
+                        continue
+                    warm_ms, read = measure(cur, sql, args.runs, set(parents))
+                    results.append({'query': name, 'years': years, 'warm_ms': warm_ms,
+                                    'partitions': read})
+    finally:
+        conn.close()
+
+    loaded = {}
+    for parent in parents.values():
+        loaded[parent] = loaded.get(parent, 0) + 1
+    print('partitions loaded: ' + ', '.join(f"{table} {n}" for table, n in sorted(loaded.items())))
+    print(f"{'query':<8} {'years':<10} {'warm ms':>10} {'partitions':>11}")
+    for r in results:
+        window = f"{r['years'][0]}-{r['years'][1]}"
+        if 'skipped' in r:
+            print(f"{r['query']:<8} {window:<10} {'-':>10} {'-':>11}  {r['skipped']}")
+        else:
+            print(f"{r['query']:<8} {window:<10} {r['warm_ms']:>10.2f} {len(r['partitions']):>11}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'partitions_loaded': loaded, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
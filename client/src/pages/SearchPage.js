@@ -15,31 +15,18 @@ export default function SearchPage() {
 
   const handleSearch = async () => {
     try {
-      const [regionRes, tempRes, rainRes, pollRes] = await Promise.all([
-        fetch("http://localhost:8080/best-region-by-crop"),
-        fetch("http://localhost:8080/best-temp-range-by-crop"),
-        fetch("http://localhost:8080/best-precip-range-by-crop"),
-        fetch("http://localhost:8080/best-pollution-range-by-crop")
-      ]);
-
-      const [regionData, tempData, rainData, pollData] = await Promise.all([
-        regionRes.json(),
-        tempRes.json(),
-        rainRes.json(),
-        pollRes.json()
-      ]);
-
-      const filtered = regionData.filter((crop) => {
-        const temp = tempData.find((t) => t.crop === crop.crop);
-        const rain = rainData.find((r) => r.crop === crop.crop);
-        const poll = pollData.find((p) => p.crop === crop.crop);
-        return (
-          crop.best_region === region &&
-          temp && temp.min_temp_f >= temperatureMin && temp.max_temp_f <= temperatureMax &&
-          rain && rain.min_precip_mm >= rainfallMin && rain.max_precip_mm <= rainfallMax &&
-          poll && poll.min_pollution_index >= pollutionMin && poll.max_pollution_index <= pollutionMax
-        );
+      // The server filters the precomputed crop envelopes
+      const params = new URLSearchParams({
+        region,
+        temp_min: temperatureMin,
+        temp_max: temperatureMax,
+        precip_min: rainfallMin,
+        precip_max: rainfallMax,
+        pollution_min: pollutionMin,
+        pollution_max: pollutionMax,
       });
+      const res = await fetch(`http://localhost:8080/search?${params}`);
+      const filtered = await res.json();
 
       setResults(filtered);
       setShowPopup(true);
@@ -0,0 +1,6 @@
+"""HarvestMatch data pipeline.
+
+``transforms`` holds the pure cleaning helpers, ``datasets`` describes the four
+sources, ``bulk_load`` creates and fills the tables and ``cli`` ties them
+together (``python -m harvest_match --help``).
+"""
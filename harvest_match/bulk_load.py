@@ -0,0 +1,286 @@
+"""COPY-based bulk loader shared by every dataset.
+
+Every table is created from explicit DDL below and filled with
+``COPY ... FROM STDIN`` straight from DataFrames, in CSV or PostgreSQL binary
+format.
+
+The tables in ``PARTITION_KEYS`` are range-partitioned with one partition per
+year, created as the first rows for that year arrive, plus a default partition
+for rows without one. A query filtering on a year range then only scans those
+years' partitions, however much history is loaded.
+"""
+
+import datetime
+import io
+import struct
+import time
+
+import numpy as np
+import pandas as pd
+
+from .db import quote_ident
+
+# Column name -> PostgreSQL type, in table order
+TABLES = {
+    'crop_data': {
+        'year': 'BIGINT',
+        'state': 'TEXT',
+        'state_id': 'SMALLINT',
+        'crop': 'TEXT',
+        'month': 'TEXT',
+        'yield_kg_per_acre': 'DOUBLE PRECISION',
+        'season': 'TEXT',
+    },
+    'pollution_data': {
+        'Date': 'TEXT',
+        'Year': 'BIGINT',
+        'Month': 'BIGINT',
+        'Day': 'BIGINT',
+        'State': 'TEXT',
+        'state_id': 'SMALLINT',
+        'County': 'TEXT',
+        'City': 'TEXT',
+        'O3 Mean': 'DOUBLE PRECISION',
+        'O3 AQI': 'DOUBLE PRECISION',
+        'CO Mean': 'DOUBLE PRECISION',
+        'CO AQI': 'DOUBLE PRECISION',
+        'SO2 Mean': 'DOUBLE PRECISION',
+        'SO2 AQI': 'DOUBLE PRECISION',
+        'NO2 Mean': 'DOUBLE PRECISION',
+        'NO2 AQI': 'DOUBLE PRECISION',
+        'Season': 'TEXT',
+    },
+    'temperature_data': {
+        'state': 'TEXT',
+        'state_id': 'SMALLINT',
+        'year': 'BIGINT',
+        'month': 'BIGINT',
+        'average_temp': 'DOUBLE PRECISION',
+        'centroid_lon': 'DOUBLE PRECISION',
+        'centroid_lat': 'DOUBLE PRECISION',
+        'season': 'TEXT',
+    },
+    'weather_events': {
+        'event_id': 'TEXT',
+        'type': 'TEXT',
+        'severity': 'TEXT',
+        'precipitation': 'DOUBLE PRECISION',
+        'timezone': 'TEXT',
+        'airport_code': 'TEXT',
+        'location_lat': 'DOUBLE PRECISION',
+        'location_lng': 'DOUBLE PRECISION',
+        'county': 'TEXT',
+        'state': 'TEXT',
+        'state_id': 'SMALLINT',
+        'start_date': 'DATE',
+        'season': 'TEXT',
+    },
+}
+
+# Table -> column it is range-partitioned on, by year
+PARTITION_KEYS = {
+    'crop_data': 'year',
+    'pollution_data': 'Year',
+    'temperature_data': 'year',
+    'weather_events': 'start_date',
+}
+
+PG_EPOCH = datetime.date(2000, 1, 1)
+BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+BINARY_TRAILER = struct.pack('!h', -1)
+
+# Rows encoded per block, bounding the index arrays built for each one
+BINARY_BLOCK_ROWS = 65_536
+
+
+def _fixed_width(dtype, values):
+    dtype = np.dtype(dtype)
+
+    def encode(col):
+        data = values(col).astype(dtype)
+        return data.view(np.uint8), np.full(len(data), dtype.itemsize)
+    return encode
+
+
+def _days(col):
+    return (pd.to_datetime(col).to_numpy('datetime64[D]') - np.datetime64(PG_EPOCH, 'D')).astype('int64')
+
+
+def _ranges(starts, lengths):
+    """Concatenated ``arange(start, start + length)`` for each pair."""
+    ends = np.cumsum(lengths)
+    return np.repeat(starts - (ends - lengths), lengths) + np.arange(ends[-1] if len(ends) else 0)
+
+
+def _text(col):
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # Encode each category once and gather the bytes by code
+        payload, lengths = _text(pd.Series(col.cat.categories))
+        codes = col.cat.codes.to_numpy()
+        return payload[_ranges((np.cumsum(lengths) - lengths)[codes], lengths[codes])], lengths[codes]
+    data = [str(s).encode('utf-8') for s in col.to_numpy(dtype=object)]
+    return np.frombuffer(b''.join(data), dtype=np.uint8), np.fromiter(map(len, data), 'int64', len(data))
+
+
+# PostgreSQL type -> encoder for a column's non-null values in COPY BINARY:
+# their concatenated big-endian bytes and the length of each value
+_binary_encoders = {
+    'BIGINT': _fixed_width('>i8', lambda col: col.to_numpy('int64')),
+    'INTEGER': _fixed_width('>i4', lambda col: col.to_numpy('int64')),
+    'SMALLINT': _fixed_width('>i2', lambda col: col.to_numpy('int64')),
+    'DOUBLE PRECISION': _fixed_width('>f8', lambda col: col.to_numpy('float64')),
+    'REAL': _fixed_width('>f4', lambda col: col.to_numpy('float64')),
+    'DATE': _fixed_width('>i4', _days),
+    'TEXT': _text,
+}
+
+
+def create_table_sql(table):
+    cols = ',\n'.join(f'    {quote_ident(c)} {t}' for c, t in TABLES[table].items())
+    # CASCADE: dependent indexes and views are recreated by ``migrations``
+    sql = f'DROP TABLE IF EXISTS {table} CASCADE;\nCREATE TABLE {table} (\n{cols}\n)'
+    if table not in PARTITION_KEYS:
+        return sql + ';'
+    return (f'{sql} PARTITION BY RANGE ({quote_ident(PARTITION_KEYS[table])});\n'
+            f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;')
+
+
+def partition_name(table, year):
+    return f"{table}_{year}"
+
+
+def partition_sql(table, year):
+    if TABLES[table][PARTITION_KEYS[table]] == 'DATE':
+        bounds = f"'{year}-01-01'", f"'{year + 1}-01-01'"
+    else:
+        bounds = year, year + 1
+    return (f"CREATE TABLE IF NOT EXISTS {partition_name(table, year)} PARTITION OF {table} "
+            f"FOR VALUES FROM ({bounds[0]}) TO ({bounds[1]})")
+
+
+def partition_years(table, df):
+    """The years of ``df``'s partition key, ascending."""
+    values = df[PARTITION_KEYS[table]]
+    if TABLES[table][PARTITION_KEYS[table]] == 'DATE':
+        values = pd.to_datetime(values).dt.year
+    return sorted(int(year) for year in values.dropna().unique())
+
+
+def create_partitions(cur, table, years):
+    """Create the missing yearly partitions among ``years``; returns the years created.
+
+    Does nothing for a table loaded before it was partitioned. Attaching a
+    partition locks the parent exclusively, so outside a fresh load run this
+    in its own short transaction.
+    """
+    cur.execute(
+        "SELECT c.relname FROM pg_partitioned_table p "
+        "LEFT JOIN pg_inherits i ON i.inhparent = p.partrelid "
+        "LEFT JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE p.partrelid = to_regclass(%s)",
+        (table,),
+    )
+    existing = {row[0] for row in cur.fetchall()}
+    if not existing:
+        return []
+    created = []
+    for year in years:
+        if partition_name(table, year) not in existing:
+            cur.execute(partition_sql(table, year))
+            created.append(year)
+    return created
+
+
+def _csv_buffer(df):
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    return buf
+
+
+def _put(buf, starts, values):
+    """Write fixed-width ``values`` into ``buf`` at byte offsets ``starts``."""
+    raw = values.view(np.uint8).reshape(len(values), values.itemsize)
+    buf[starts[:, None] + np.arange(values.itemsize)] = raw
+
+
+def _binary_block(df, types):
+    """COPY BINARY tuples for ``df``, built with array scatters rather than per value."""
+    n = len(df)
+    fields = []
+    sizes = np.full(n, 2, dtype='int64')
+    for col in df.columns:
+        present = df[col].notna().to_numpy()
+        payload, lengths = _binary_encoders[types[col]](df[col][present])
+        length = np.full(n, -1, dtype='int64')  # -1 marks NULL
+        length[present] = lengths
+        fields.append((length, payload))
+        sizes += 4 + np.maximum(length, 0)
+
+    ends = np.cumsum(sizes)
+    pos = ends - sizes
+    buf = np.empty(int(ends[-1]), dtype=np.uint8)
+    _put(buf, pos, np.full(n, len(fields), dtype='>i2'))
+    pos = pos + 2
+    for length, payload in fields:
+        _put(buf, pos, length.astype('>i4'))
+        present = length >= 0
+        buf[_ranges((pos + 4)[present], length[present])] = payload
+        pos = pos + 4 + np.maximum(length, 0)
+    return buf.tobytes()
+
+
+def _binary_buffer(df, types):
+    for col in df.columns:
+        if types[col] not in _binary_encoders:
+            raise ValueError(f"binary COPY does not support {types[col]} column {col!r}")
+
+    out = io.BytesIO()
+    out.write(BINARY_HEADER)
+    for start in range(0, len(df), BINARY_BLOCK_ROWS):
+        out.write(_binary_block(df.iloc[start:start + BINARY_BLOCK_ROWS], types))
+    out.write(BINARY_TRAILER)
+    out.seek(0)
+    return out
+
+
+def copy_dataframe(cur, table, df, fmt='csv'):
+    """COPY one DataFrame into ``table``; columns are matched by name."""
+    types = TABLES[table]
+    df = df[list(types)]
+    if table in PARTITION_KEYS:
+        create_partitions(cur, table, partition_years(table, df))
+    cols = ', '.join(quote_ident(c) for c in types)
+    if fmt == 'csv':
+        buf = _csv_buffer(df)
+        cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+    elif fmt == 'binary':
+        buf = _binary_buffer(df, types)
+        cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH (FORMAT binary)", buf)
+    else:
+        raise ValueError(f"unknown COPY format {fmt!r}")
+    return len(df)
+
+
+def load(conn, table, frames, fmt='csv', commit=True):
+    """Recreate ``table`` and COPY every frame into it in one transaction.
+
+    ``frames`` may be a single DataFrame or any iterable of them (e.g. a
+    ``read_csv`` chunk reader). Returns the number of rows loaded. With
+    ``commit=False`` the transaction is left open for the caller to extend.
+    """
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+
+    start = time.perf_counter()
+    rows = 0
+    with conn.cursor() as cur:
+        cur.execute(create_table_sql(table))
+        for df in frames:
+            rows += copy_dataframe(cur, table, df, fmt)
+    if commit:
+        conn.commit()
+
+    elapsed = time.perf_counter() - start
+    print(f"{table}: loaded {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return rows
@@ -0,0 +1,146 @@
+"""Command line entry point: ``python -m harvest_match [DATASET ...]``."""
+
+import argparse
+
+from .datasets import DATASETS, extract_transform
+from .facts import create_fact_table, load_with_facts
+from .incremental import load_incremental
+from .migrations import apply_migrations
+from .orchestrator import run_parallel
+from .publish import publish
+from .queryspec import export_queries
+from .schema import frame_mb
+from .states import load_states
+from .views import affected_views, refresh_views
+
+
+def run_incremental(names, data_dir=None, fmt='csv', snapshot_dir=None):
+    from .db import connect
+
+    conn = connect()
+    try:
+        load_states(conn)
+        create_fact_table(conn)
+        changes = {}
+        for name in names:
+            dataset = DATASETS[name]
+            _, changes[dataset.table] = load_incremental(conn, dataset, data_dir, fmt)
+        refreshed = refresh_views(conn, affected_views(changes))
+        print(f"refreshed {len(refreshed)} materialized view(s): {', '.join(refreshed) or '-'}")
+        publish(conn, snapshot_dir)
+    finally:
+        conn.close()
+
+
+def cleaned_frames(dataset, data_dir=None, cache_dir=None, synthetic=None, seed=0):
+    if synthetic is not None:
+        from .synthetic import synthetic_frames
+        return synthetic_frames(dataset.table, synthetic, seed)
+    if cache_dir is None:
+        return extract_transform(dataset, data_dir)
+    from .staging import staged_frames
+    return staged_frames(dataset, data_dir, cache_dir)
+
+
+def migrate():
+    from .db import connect
+
+    conn = connect()
+    try:
+        created = apply_migrations(conn)
+        print(f"created {len(created)} index(es)/materialized view(s): {', '.join(created) or '-'}")
+    finally:
+        conn.close()
+
+
+def run(names, data_dir=None, fmt='csv', transform_only=False, cache_dir=None,
+        synthetic=None, seed=0, snapshot_dir=None):
+    if transform_only:
+        for name in names:
+            rows = mb = 0
+            for df in cleaned_frames(DATASETS[name], data_dir, cache_dir, synthetic, seed):
+                rows += len(df)
+                mb += frame_mb(df)
+            print(f"{name}: {rows} clean rows, {mb:.1f} MB in memory")
+        return
+
+    from .db import connect
+
+    conn = connect()
+    try:
+        load_states(conn)
+        create_fact_table(conn)
+        for name in names:
+            dataset = DATASETS[name]
+            frames = cleaned_frames(dataset, data_dir, cache_dir, synthetic, seed)
+            load_with_facts(conn, dataset.table, frames, fmt)
+        publish(conn, snapshot_dir)
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m harvest_match',
+        description='Clean the raw datasets and bulk load them into PostgreSQL.',
+    )
+    parser.add_argument('datasets', nargs='*', metavar='DATASET',
+                        help=f"any of {', '.join(DATASETS)} (default: all)")
+    parser.add_argument('--data-dir',
+                        help='directory holding the raw CSVs (skips the Kaggle download)')
+    parser.add_argument('--format', choices=['csv', 'binary'], default='csv',
+                        help='COPY format (default: csv)')
+    parser.add_argument('--cache-dir',
+                        help='stage cleaned data as Parquet here and reuse it while the source is unchanged')
+    parser.add_argument('--transform-only', action='store_true',
+                        help='clean the data and report row counts without loading')
+    parser.add_argument('--migrate', action='store_true',
+                        help='only create missing indexes and materialized views, then exit')
+    parser.add_argument('--export-queries', metavar='PATH',
+                        help='only write the rendered SQL for server/routes.js to PATH, then exit')
+    parser.add_argument('--snapshot-dir',
+                        help='after loading, export static JSON snapshots of the endpoints here')
+    parser.add_argument('--synthetic', type=int, metavar='SCALE',
+                        help='load deterministic synthetic data at SCALE x the base row counts instead')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed for --synthetic (default: 0)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only load rows newer than what each table already holds')
+    parser.add_argument('--parallel', action='store_true',
+                        help='transform datasets in a process pool and load them concurrently')
+    parser.add_argument('--jobs', type=int,
+                        help='transform worker processes for --parallel (default: one per dataset)')
+    parser.add_argument('--load-concurrency', type=int, default=2,
+                        help='concurrent loads for --parallel (default: 2)')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.datasets if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(unknown)}")
+
+    if args.incremental and (args.parallel or args.transform_only or args.cache_dir):
+        parser.error("--incremental cannot be combined with --parallel, --transform-only or --cache-dir")
+
+    if args.synthetic is not None and (args.incremental or args.parallel or args.cache_dir
+                                       or args.data_dir):
+        parser.error("--synthetic cannot be combined with --incremental, --parallel, --cache-dir "
+                     "or --data-dir")
+    if args.synthetic is not None and args.synthetic < 1:
+        parser.error("--synthetic SCALE must be at least 1")
+
+    names = args.datasets or list(DATASETS)
+    if args.export_queries:
+        queries = export_queries(args.export_queries)
+        print(f"wrote {len(queries)} queries to {args.export_queries}")
+        return
+    if args.migrate:
+        migrate()
+        return
+    if args.incremental:
+        run_incremental(names, args.data_dir, args.format, args.snapshot_dir)
+    elif args.parallel and not args.transform_only:
+        run_parallel(names, args.data_dir, args.format, args.jobs, args.load_concurrency,
+                     args.cache_dir, args.snapshot_dir)
+    else:
+        run(names, args.data_dir, args.format, args.transform_only, args.cache_dir,
+            args.synthetic, args.seed, args.snapshot_dir)
@@ -0,0 +1,105 @@
+"""The ``best_conditions`` table behind ``/best-conditions`` (query 3).
+
+For every crop: the pollution, temperature and precipitation tercile (Low,
+Mid or High) in which it yields most. In SQL this took three label views that
+join every ``crop_data`` row to its climate and sort the joined rows for a
+global ``NTILE(3)``, rebuilt on each refresh. ``engine.AnalyticsEngine`` now
+computes the cut points once per metric over the (year, state) readings and
+bins the crop rows with ``searchsorted``; this module writes its answer back
+as a small table, rebuilt at the end of every load in one transaction.
+
+``REFERENCE_SQL`` is the same computation in SQL over ``state_year_climate``
+(only the (year, state)s the metric's source covers) and ``temperature_data``,
+with ties at a cut resolved like ``engine.tercile``;
+``engine.verify`` checks the table against it.
+"""
+
+from psycopg2.extras import execute_values
+
+from .engine import LABELS, AnalyticsEngine
+from .facts import FACT_TABLE
+
+CONDITIONS_TABLE = 'best_conditions'
+# Read by AnalyticsEngine.from_database
+CONDITIONS_SOURCES = ('crop_data', 'temperature_data', FACT_TABLE)
+
+CONDITIONS_DDL = f"""
+CREATE TABLE IF NOT EXISTS {CONDITIONS_TABLE} (
+    crop TEXT PRIMARY KEY,
+    best_pollution TEXT,
+    best_temp TEXT,
+    best_precip TEXT
+);
+"""
+
+_TERCILE_SQL = """
+{metric}_rows AS (
+  SELECT
+    c.crop,
+    c.yield_kg_per_acre,
+    {value} AS value,
+    NTILE(3) OVER (ORDER BY {value}) AS tile
+  FROM crop_data c
+  JOIN {source} ON c.year = {alias}.year AND c.state_id = {alias}.state_id
+  WHERE c.year BETWEEN 2016 AND 2022 AND {covered}
+),
+{metric}_best AS (
+  SELECT
+    crop,
+    tile,
+    ROW_NUMBER() OVER (PARTITION BY crop ORDER BY AVG(yield_kg_per_acre) DESC) AS rank
+  FROM (
+    -- A run of equal values shares the highest tile any of it reached
+    SELECT crop, yield_kg_per_acre, MAX(tile) OVER (PARTITION BY value) AS tile
+    FROM {metric}_rows
+  ) t
+  GROUP BY crop, tile
+)"""
+
+_LABEL_SQL = f"CASE {{}}.tile WHEN 1 THEN '{LABELS[0]}' WHEN 2 THEN '{LABELS[1]}' ELSE '{LABELS[2]}' END"
+
+REFERENCE_SQL = "WITH" + ",".join([
+    _TERCILE_SQL.format(metric='pollution', value='p.pollution_score', alias='p',
+                        source=f'{FACT_TABLE} p',
+                        covered='p.pollution_rows IS NOT NULL'),
+    _TERCILE_SQL.format(metric='temp', value='t.average_temp', alias='t',
+                        source='temperature_data t',
+                        covered='t.average_temp IS NOT NULL'),
+    _TERCILE_SQL.format(metric='precip', value='y.avg_precip', alias='y',
+                        source=f'{FACT_TABLE} y',
+                        covered='y.precip_events IS NOT NULL'),
+]) + f"""
+SELECT
+  p.crop,
+  {_LABEL_SQL.format('p')} AS best_pollution,
+  {_LABEL_SQL.format('t')} AS best_temp,
+  {_LABEL_SQL.format('r')} AS best_precip
+FROM pollution_best p
+JOIN temp_best t ON p.crop = t.crop AND t.rank = 1
+JOIN precip_best r ON p.crop = r.crop AND r.rank = 1
+WHERE p.rank = 1
+ORDER BY p.crop
+"""
+
+
+def build_best_conditions(conn, engine=None):
+    """Replace the contents of ``best_conditions``; returns the number of crops.
+
+    Builds an ``AnalyticsEngine`` from the database unless one is given.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(%s::text[]) AS name",
+                    (list(CONDITIONS_SOURCES),))
+        if not cur.fetchone()[0]:
+            return 0
+    engine = engine or AnalyticsEngine.from_database(conn)
+    rows = [(row['crop'], row['best_pollution'], row['best_temp'], row['best_precip'])
+            for row in engine.query('query3')]
+    with conn.cursor() as cur:
+        cur.execute(CONDITIONS_DDL)
+        cur.execute(f"DELETE FROM {CONDITIONS_TABLE}")
+        if rows:
+            execute_values(cur, f"INSERT INTO {CONDITIONS_TABLE} VALUES %s", rows)
+    conn.commit()
+    print(f"{CONDITIONS_TABLE}: {len(rows)} crops")
+    return len(rows)
@@ -0,0 +1,192 @@
+"""The four source datasets: where they come from and how they are cleaned.
+
+Each ``clean_*`` function is a pure raw-DataFrame -> table-DataFrame
+transform whose columns match ``bulk_load.TABLES``.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import pandas as pd
+
+from .schema import (
+    CROPS_DTYPES,
+    CROPS_USECOLS,
+    POLLUTION_DTYPES,
+    POLLUTION_ID_COLUMNS,
+    TEMPERATURE_DTYPES,
+    WEATHER_DTYPES,
+    pollution_usecols,
+    temperature_usecols,
+)
+from .states import state_ids
+from .transforms import (
+    normalize_state,
+    season_from_month,
+    season_from_month_abbr,
+    select_columns,
+    yield_kg_per_acre,
+)
+
+# USDA NASS Quick Stats export (downloaded by hand, not on Kaggle)
+CROPS_CSV = 'B58A9A34-259A-3631-A697-A61F6F6916DB.csv'
+
+# Rows per weather chunk; peak memory is bounded by this, not by the file size
+WEATHER_CHUNK_SIZE = 250_000
+
+# Raw column -> table column, in table order (City, ZipCode, EndTime are never read)
+WEATHER_COLUMNS = {
+    'EventId': 'event_id',
+    'Type': 'type',
+    'Severity': 'severity',
+    'Precipitation(in)': 'precipitation',
+    'TimeZone': 'timezone',
+    'AirportCode': 'airport_code',
+    'LocationLat': 'location_lat',
+    'LocationLng': 'location_lng',
+    'County': 'county',
+    'State': 'state',
+    'StartTime(UTC)': 'start_date',
+}
+
+
+def clean_crops(df):
+    month = df['Period'].str.extract(r'-\s*([A-Z]+)')[0].str.title()
+    unit = df['Data Item'].str.extract(r'MEASURED IN (.+)')[0].str.strip()
+    out = pd.DataFrame({
+        'year': df['Year'],
+        'state': df['State'],
+        'crop': df['Commodity'],
+        'month': month,
+        'yield_kg_per_acre': yield_kg_per_acre(df['Value'], unit, df['Commodity']),
+    })
+    out = out.dropna(subset=['yield_kg_per_acre'])
+    out['state_id'] = state_ids(out['state'])
+    out['season'] = season_from_month_abbr(out['month'])
+    return out
+
+
+def clean_pollution(df):
+    value_cols = [c for c in df.columns if c.endswith('Mean') or c.endswith('AQI')]
+    out = df[POLLUTION_ID_COLUMNS + value_cols].copy()
+    out['Season'] = season_from_month(out['Month'])
+    out = out.dropna().reset_index(drop=True)
+    # Added after dropna: rows outside the 50 states + DC keep a NULL id
+    out['state_id'] = state_ids(out['State'])
+    return out
+
+
+def clean_temperature(df):
+    cols_to_drop = [c for c in df.columns
+                    if c.startswith('Unnamed') or c == 'monthly_mean_from_1901_to_2000']
+    out = df.drop(columns=cols_to_drop).dropna().reset_index(drop=True)
+    out['state_id'] = state_ids(out['state'])
+    out['season'] = season_from_month(out['month'])
+    return out
+
+
+def clean_weather(df):
+    start = pd.to_datetime(df['StartTime(UTC)'])
+    out = select_columns(df, WEATHER_COLUMNS)
+    out['state'] = normalize_state(df['State'])
+    out['state_id'] = state_ids(out['state'])
+    out['start_date'] = start.dt.date
+    out['season'] = season_from_month(start.dt.month)
+    return out
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    table: str
+    filename: str
+    clean: Callable
+    # Period column in the table and the raw column it is derived from
+    watermark: str
+    raw_watermark: str
+    # Raw column holding the state
+    raw_state: str
+    kaggle_handle: Optional[str] = None
+    read_kwargs: dict = field(default_factory=dict)
+
+
+DATASETS = {
+    'crops': Dataset(
+        name='crops',
+        table='crop_data',
+        filename=CROPS_CSV,
+        clean=clean_crops,
+        watermark='year',
+        raw_watermark='Year',
+        raw_state='State',
+        read_kwargs={'usecols': CROPS_USECOLS, 'dtype': CROPS_DTYPES},
+    ),
+    'pollution': Dataset(
+        name='pollution',
+        table='pollution_data',
+        filename='pollution_2000_2021.csv',
+        clean=clean_pollution,
+        watermark='Year',
+        raw_watermark='Year',
+        raw_state='State',
+        kaggle_handle='alpacanonymous/us-pollution-20002021',
+        read_kwargs={'usecols': pollution_usecols, 'dtype': POLLUTION_DTYPES},
+    ),
+    'temperature': Dataset(
+        name='temperature',
+        table='temperature_data',
+        filename='average_monthly_temperature_by_state_1950-2022.csv',
+        clean=clean_temperature,
+        watermark='year',
+        raw_watermark='year',
+        raw_state='state',
+        kaggle_handle='justinrwong/average-monthly-temperature-by-us-state',
+        read_kwargs={'usecols': temperature_usecols, 'dtype': TEMPERATURE_DTYPES},
+    ),
+    'weather': Dataset(
+        name='weather',
+        table='weather_events',
+        filename='WeatherEvents_Jan2016-Dec2022.csv',
+        clean=clean_weather,
+        watermark='start_date',
+        raw_watermark='StartTime(UTC)',
+        raw_state='State',
+        kaggle_handle='sobhanmoosavi/us-weather-events',
+        read_kwargs={
+            'usecols': list(WEATHER_COLUMNS),
+            'dtype': WEATHER_DTYPES,
+            'chunksize': WEATHER_CHUNK_SIZE,
+        },
+    ),
+}
+
+
+def source_path(dataset, data_dir=None):
+    """Local path of the raw CSV, downloading from Kaggle when needed."""
+    if data_dir is not None:
+        return os.path.join(data_dir, dataset.filename)
+    if dataset.kaggle_handle is None:
+        return dataset.filename
+    import kagglehub
+    return os.path.join(kagglehub.dataset_download(dataset.kaggle_handle), dataset.filename)
+
+
+def read_raw(dataset, path, **overrides):
+    """Yield raw frames: the whole file, or bounded chunks when configured.
+
+    ``overrides`` replace entries of ``dataset.read_kwargs``, e.g. ``usecols``.
+    """
+    reader = pd.read_csv(path, **{**dataset.read_kwargs, **overrides})
+    if isinstance(reader, pd.DataFrame):
+        yield reader
+    else:
+        with reader:
+            yield from reader
+
+
+def extract_transform(dataset, data_dir=None):
+    """Yield cleaned frames ready for ``bulk_load.load``."""
+    path = source_path(dataset, data_dir)
+    for raw in read_raw(dataset, path):
+        yield dataset.clean(raw)
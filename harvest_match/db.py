@@ -0,0 +1,24 @@
+"""Database connection settings.
+
+Defaults point at the project RDS instance; set the usual ``PG*`` environment
+variables to use a local PostgreSQL instead.
+"""
+
+import os
+
+import psycopg2
+
+
+def connect():
+    return psycopg2.connect(
+        host=os.environ.get('PGHOST', 'database-1.cyljtjkkhdgh.us-east-1.rds.amazonaws.com'),
+        dbname=os.environ.get('PGDATABASE', 'postgres'),
+        user=os.environ.get('PGUSER', 'postgres'),
+        password=os.environ.get('PGPASSWORD', 'database1234'),
+        port=int(os.environ.get('PGPORT', 5432)),
+        sslmode=os.environ.get('PGSSLMODE', 'require'),
+    )
+
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
@@ -0,0 +1,524 @@
+"""In-memory answers to the ten queries in ``queries/optimized_queries.py``.
+
+Once aggregated, the data behind the queries is small: a few dozen crops,
+about fifty states and a handful of years. ``AnalyticsEngine`` loads it once
+into NumPy columns and computes every query's result with vectorized
+group-bys, so answering is a dictionary lookup rather than a database round
+trip:
+
+* ``crop_data`` and ``temperature_data`` rows, with state, crop and season
+  integer-coded against sorted dictionaries (temperature rows are kept
+  because query 3 weighs every monthly reading);
+* per-(year, state) pollution and precipitation sums and counts, read from
+  ``state_year_climate`` or accumulated from cleaned frames with the same
+  ``facts.FactAccumulator``, on a dense year x state grid.
+
+Values are rounded like PostgreSQL rounds ``float8::numeric``: through 15
+significant digits, half away from zero, returned as ``Decimal``, so rows
+compare equal to what psycopg2 returns. ``verify`` runs the SQL and reports
+every row that differs. Floating-point summation order can move a value by one
+unit in its last place. Where ``ROW_NUMBER`` breaks ties in SQL, the pick is
+arbitrary there and the engine takes the first in sorted order.
+
+Query 3's Low/Mid/High terciles are cut once per metric on the (year, state)
+readings, weighted by the crop rows joining them, and crop rows are binned
+with ``searchsorted`` (``tercile_cuts``), instead of sorting every joined row.
+The one difference from ``NTILE``: a run of equal values straddling a cut goes
+wholly to the upper tercile rather than being split arbitrarily.
+``conditions.build_best_conditions`` writes that answer back as the
+``best_conditions`` table the query reads.
+
+Query 4's thresholds are an ``Extremes``; ``resilient_crops`` scores the
+(year, state) readings against any set of them and sums per-(crop, cell)
+yield totals kept from construction, so a threshold sweep never rescans rows.
+"""
+
+import decimal
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .facts import CLIMATE_YEARS, FACT_TABLE, FactAccumulator
+from .profiles import PROFILE_YEARS
+from .states import STATES
+from .views import MATERIALIZED_VIEWS
+
+# Year windows, as in the views and queries
+TREND_YEARS = MATERIALIZED_VIEWS['crop_yearly_mv'].years
+
+POLLUTANTS = ('avg_co', 'avg_no2', 'avg_so2', 'avg_o3')
+REGIONS = {name: region for name, _, region in STATES}
+LABELS = ('Low', 'Mid', 'High')
+
+
+@dataclass(frozen=True)
+class Extremes:
+    """Query 4's thresholds for ``AnalyticsEngine.resilient_crops``.
+
+    A (year, state) scores a point for each reading outside its bounds, and a
+    crop row counts as grown in extremes when its (year, state) scores at
+    least ``min_score``.
+    """
+    # Pollution score above this
+    pollution: float = 16
+    # Average temperature below the first or above the second
+    temp: tuple = (20, 80)
+    # Average precipitation at or below the first or above the second
+    precip: tuple = (0.01, 0.16)
+    min_score: int = 2
+
+
+# The thresholds query 4 hardcodes
+EXTREMES = Extremes()
+
+CROP_COLUMNS = ['year', 'state', 'crop', 'season', 'yield_kg_per_acre']
+TEMPERATURE_COLUMNS = ['year', 'state', 'average_temp']
+CLIMATE_COLUMNS = ['year', 'state', *POLLUTANTS, 'pollution_rows', 'avg_precip', 'precip_events']
+
+
+def pg_round(value, digits):
+    """``ROUND(value::numeric, digits)`` for a float; ``None`` for NaN/NULL."""
+    if value is None or value != value:
+        return None
+    return decimal.Decimal(format(float(value), '.15g')).quantize(
+        decimal.Decimal(1).scaleb(-digits), rounding=decimal.ROUND_HALF_UP)
+
+
+def _encode(values, categories):
+    """Codes of ``values`` in ``categories``; -1 for missing or unknown."""
+    return pd.Categorical(values, categories=categories).codes.astype(np.int64)
+
+
+def _categories(*columns):
+    return np.array(sorted(set().union(*(c.dropna().unique() for c in columns))), dtype=object)
+
+
+def _mean_by(codes, values, size):
+    """Per-code mean and count; NaN where a code has no rows."""
+    sums = np.bincount(codes, weights=values, minlength=size)
+    counts = np.bincount(codes, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts, counts
+
+
+def _best(means, counts):
+    """Column of the highest mean in each row, -1 for rows without any.
+
+    ``ROW_NUMBER() OVER (PARTITION BY row ORDER BY mean DESC) = 1``.
+    """
+    if means.shape[1] == 0:
+        return np.full(means.shape[0], -1)
+    best = np.where(counts > 0, means, -np.inf).argmax(axis=1)
+    best[~(counts > 0).any(axis=1)] = -1
+    return best
+
+
+def tercile_cuts(values, weights, buckets=3):
+    """Cut points of ``NTILE(buckets) OVER (ORDER BY value)``, NaN (NULL) last.
+
+    The rows being split repeat each of ``values`` ``weights`` times, so the
+    sort runs over the distinct values instead of every joined row. Returns
+    the value at which each bucket after the first starts; NaN for a bucket
+    that gets no rows.
+    """
+    if values.size == 0:
+        return np.full(buckets - 1, np.nan)
+    order = np.argsort(values, kind='stable')
+    ends = np.cumsum(weights[order])
+    size, extra = divmod(int(ends[-1]), buckets)
+    # 0-based row position where each bucket starts; the first ``extra`` hold a row more
+    starts = np.array([b * size + min(b, extra) for b in range(1, buckets)])
+    index = np.searchsorted(ends, starts, side='right')
+    return np.where(index < order.size, values[order][np.minimum(index, order.size - 1)], np.nan)
+
+
+def tercile(values, cuts):
+    """0-based bucket of each value for ``tercile_cuts``.
+
+    Unlike ``NTILE``, rows with equal values always share a bucket: a tie
+    across a cut goes to the upper one instead of being split arbitrarily.
+    """
+    return np.searchsorted(cuts, values, side='right')
+
+
+def _frame(cur, sql):
+    cur.execute(sql)
+    return pd.DataFrame.from_records(cur.fetchall(), columns=[col.name for col in cur.description])
+
+
+class AnalyticsEngine:
+    """Every query result, computed from arrays once at construction.
+
+    ``crops``, ``temperature`` and ``climate`` are DataFrames with
+    ``CROP_COLUMNS``, ``TEMPERATURE_COLUMNS`` and ``CLIMATE_COLUMNS``, states
+    upper-cased; use ``from_database`` or ``from_frames`` to build them.
+    """
+
+    def __init__(self, crops, temperature, climate):
+        crops = crops[crops['state'].notna()]
+        self.states = _categories(crops['state'], temperature['state'], climate['state'])
+        self.crops = _categories(crops['crop'])
+        self.seasons = _categories(crops['season'])
+        years = pd.concat([crops['year'], temperature['year'], climate['year']]).astype('int64')
+        self.first_year = int(years.min()) if len(years) else CLIMATE_YEARS[0]
+        self.years = np.arange(self.first_year, (int(years.max()) if len(years) else CLIMATE_YEARS[1]) + 1)
+        n_years, n_states = len(self.years), len(self.states)
+
+        self.crop_year = crops['year'].to_numpy(np.int64)
+        self.crop_state = _encode(crops['state'], self.states)
+        self.crop_code = _encode(crops['crop'], self.crops)
+        self.crop_season = _encode(crops['season'], self.seasons)
+        self.crop_yield = crops['yield_kg_per_acre'].to_numpy(np.float64)
+        self.crop_cell = self._cell(self.crop_year, self.crop_state)
+
+        self.temp_cell = self._cell(temperature['year'].to_numpy(np.int64),
+                                    _encode(temperature['state'], self.states))
+        self.temp_value = temperature['average_temp'].to_numpy(np.float64)
+        size = n_years * n_states
+        self.temp_sum = np.bincount(self.temp_cell, self.temp_value, size).reshape(n_years, n_states)
+        self.temp_rows = np.bincount(self.temp_cell, minlength=size).reshape(n_years, n_states)
+
+        # Climate grid; precip_events stays NaN where weather_events has no row,
+        # since the fact table keeps (year, state) rows whose precipitation is all NULL
+        climate = climate.astype({c: 'float64' for c in CLIMATE_COLUMNS[2:]})
+        cell = self._cell(climate['year'].to_numpy(np.int64), _encode(climate['state'], self.states))
+        rows = climate['pollution_rows'].fillna(0).to_numpy()
+        self.pollution_rows = np.zeros(n_years * n_states)
+        np.add.at(self.pollution_rows, cell, rows)
+        self.pollution_sums = np.zeros((len(POLLUTANTS), n_years * n_states))
+        for i, column in enumerate(POLLUTANTS):
+            np.add.at(self.pollution_sums[i], cell, np.nan_to_num(climate[column].to_numpy() * rows))
+        self.pollution_rows = self.pollution_rows.reshape(n_years, n_states)
+        self.pollution_sums = self.pollution_sums.reshape(len(POLLUTANTS), n_years, n_states)
+        events = climate['precip_events'].to_numpy()
+        self.precip_events = np.full(n_years * n_states, np.nan)
+        self.precip_events[cell] = events
+        self.precip_sum = np.zeros(n_years * n_states)
+        self.precip_sum[cell] = np.nan_to_num(climate['avg_precip'].to_numpy() * events)
+        self.precip_events = self.precip_events.reshape(n_years, n_states)
+        self.precip_sum = self.precip_sum.reshape(n_years, n_states)
+
+        # Query 4's inputs, so any thresholds only touch the year x state grid:
+        # each cell's three readings and each crop's yield totals per cell
+        self.cell_climate = np.stack([self._pollution_score().ravel(), self._temp_avg().ravel(),
+                                      self._precip_avg().ravel()])
+        rows = self._crop_rows(CLIMATE_YEARS)
+        cells = self.crop_code[rows] * size + self.crop_cell[rows]
+        self.cell_yield_sums = np.bincount(cells, self.crop_yield[rows],
+                                           len(self.crops) * size).reshape(len(self.crops), size)
+        self.cell_yield_rows = np.bincount(cells, minlength=len(self.crops) * size).reshape(len(self.crops), size)
+
+        self.profiles = self._state_profiles()
+        self.results = {
+            'query2': self._crop_trends(),
+            'query3': self._best_conditions(),
+            'query4': self.resilient_crops(),
+            'query5': self._pollution_ranges(),
+            'query6': self._best_regions(),
+            'query7': self._precip_ranges(),
+            'query8': self._temperature_ranges(),
+            'query9': self._best_crop_by_season(),
+            'query10': self._best_season_by_crop(),
+        }
+
+    @classmethod
+    def from_database(cls, conn):
+        """Read the base rows and ``state_year_climate`` in three queries."""
+        with conn.cursor() as cur:
+            crops = _frame(cur, "SELECT year, UPPER(state) AS state, crop, season, yield_kg_per_acre "
+                                "FROM crop_data")
+            temperature = _frame(cur, "SELECT year, UPPER(state) AS state, average_temp "
+                                      "FROM temperature_data")
+            climate = _frame(cur, f"SELECT {', '.join(CLIMATE_COLUMNS)} FROM {FACT_TABLE}")
+        conn.rollback()
+        return cls(crops, temperature, climate)
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Build from cleaned frames, ``{table: iterable of DataFrames}`` as loaded."""
+        def rows(table, columns):
+            parts = [df[columns] for df in frames.get(table, ())]
+            df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+            df = df.astype({c: object for c in ('state', 'crop', 'season') if c in columns})
+            df['state'] = df['state'].str.upper()
+            return df
+
+        climate = None
+        for table in ('pollution_data', 'weather_events'):
+            accumulator = FactAccumulator(table)
+            for df in frames.get(table, ()):
+                accumulator.add(df)
+            result = accumulator.result().drop(columns='state_id')
+            climate = result if climate is None else climate.merge(result, on=['year', 'state'], how='outer')
+        return cls(rows('crop_data', CROP_COLUMNS), rows('temperature_data', TEMPERATURE_COLUMNS),
+                   climate.reindex(columns=CLIMATE_COLUMNS))
+
+    def _cell(self, year, state):
+        return (year - self.first_year) * len(self.states) + state
+
+    def _window(self, years):
+        """Slice of the year axis covering the inclusive ``years``."""
+        return slice(max(years[0] - self.first_year, 0), max(years[1] - self.first_year + 1, 0))
+
+    def _crop_rows(self, years):
+        return (self.crop_year >= years[0]) & (self.crop_year <= years[1])
+
+    def _crop_states(self, years):
+        """``[crop, state]`` mask of ``SELECT DISTINCT state_id, crop`` in ``years``."""
+        rows = self._crop_rows(years)
+        grown = np.zeros((len(self.crops), len(self.states)), dtype=bool)
+        grown[self.crop_code[rows], self.crop_state[rows]] = True
+        return grown
+
+    def _pollution_score(self):
+        """Per-(year, state) ``pollution_score``; NaN where there is no pollution data."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.pollution_sums / self.pollution_rows).sum(axis=0)
+
+    def _precip_avg(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.precip_events > 0, self.precip_sum / self.precip_events, np.nan)
+
+    def _temp_avg(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.temp_sum / self.temp_rows
+
+    def _yield_means(self, rows, groups, n_groups, columns, n_columns):
+        means, counts = _mean_by(groups[rows] * n_columns + columns[rows],
+                                 self.crop_yield[rows], n_groups * n_columns)
+        return means.reshape(n_groups, n_columns), counts.reshape(n_groups, n_columns)
+
+    # Query 1
+    def _state_profiles(self):
+        window = self._window(PROFILE_YEARS)
+        rows = self.pollution_rows[window].sum(axis=0)
+        events = np.nansum(self.precip_events[window], axis=0)
+        temp_rows = self.temp_rows[window].sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pollutants = self.pollution_sums[:, window].sum(axis=1) / rows
+            precip = np.where(events > 0, self.precip_sum[window].sum(axis=0) / events, np.nan)
+            temp = np.where(temp_rows > 0, self.temp_sum[window].sum(axis=0) / temp_rows, np.nan)
+        crop_rows = self._crop_rows(PROFILE_YEARS)
+        dominant = _best(*self._yield_means(crop_rows, self.crop_state, len(self.states),
+                                            self.crop_code, len(self.crops)))
+        profiles = {}
+        for s in np.flatnonzero(rows > 0):
+            profiles[self.states[s]] = {
+                'state': self.states[s],
+                **{name: pg_round(pollutants[i, s], 4) for i, name in enumerate(POLLUTANTS)},
+                'avg_precipitation': pg_round(precip[s], 2),
+                'avg_temp': pg_round(temp[s], 2),
+                'dominant_crop': self.crops[dominant[s]] if dominant[s] >= 0 else None,
+            }
+        return profiles
+
+    # Query 2
+    def _crop_trends(self):
+        rows = self._crop_rows(TREND_YEARS)
+        means, counts = _mean_by(self.crop_cell[rows], self.crop_yield[rows], self.years.size * len(self.states))
+        pollutants = self.pollution_sums.reshape(len(POLLUTANTS), -1)
+        pollution_rows = self.pollution_rows.ravel()
+        precip, temp = self._precip_avg().ravel(), self._temp_avg().ravel()
+        cells = np.flatnonzero(counts)
+        year, state = np.divmod(cells, len(self.states))
+        result = []
+        for cell in cells[np.lexsort((year, state))]:
+            y, s = divmod(cell, len(self.states))
+            polluted = pollution_rows[cell] > 0
+            result.append({
+                'year': int(self.years[y]),
+                'state': self.states[s],
+                'avg_yield': pg_round(means[cell], 2),
+                **{name: pg_round(pollutants[i, cell] / pollution_rows[cell], 4) if polluted else None
+                   for i, name in enumerate(POLLUTANTS)},
+                'avg_precipitation': pg_round(precip[cell], 2),
+                'avg_temp': pg_round(temp[cell], 2),
+            })
+        return result
+
+    # Query 3
+    def _best_tercile(self, rows, cells, values):
+        """Best tercile per crop, each crop row in ``rows`` joined to the readings of its cell.
+
+        ``cells`` and ``values`` list the readings (one per (year, state) for
+        pollution and precipitation, one per monthly row for temperature). The
+        cut points are weighted by how many crop rows join each reading, then
+        every crop row adds its yield to a tercile once per reading in it.
+        """
+        size = self.years.size * len(self.states)
+        per_cell = np.bincount(self.crop_cell[rows], minlength=size)
+        buckets = tercile(values, tercile_cuts(values, per_cell[cells]))
+        readings = np.bincount(cells * len(LABELS) + buckets, minlength=size * len(LABELS))
+        weights = readings.reshape(size, len(LABELS))[self.crop_cell[rows]]
+        crops, yields = self.crop_code[rows], self.crop_yield[rows]
+        sums = np.column_stack([np.bincount(crops, yields * weights[:, g], len(self.crops))
+                                for g in range(len(LABELS))])
+        counts = np.column_stack([np.bincount(crops, weights[:, g], len(self.crops))
+                                  for g in range(len(LABELS))])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return _best(sums / counts, counts)
+
+    def _best_conditions(self):
+        rows = np.flatnonzero(self._crop_rows(CLIMATE_YEARS))
+        polluted = np.flatnonzero(self.pollution_rows.ravel() > 0)
+        best_pollution = self._best_tercile(rows, polluted, self._pollution_score().ravel()[polluted])
+        best_temp = self._best_tercile(rows, self.temp_cell, self.temp_value)
+        rained = np.flatnonzero(~np.isnan(self.precip_events.ravel()))
+        best_precip = self._best_tercile(rows, rained, self._precip_avg().ravel()[rained])
+        return [
+            {'crop': self.crops[c], 'best_pollution': LABELS[best_pollution[c]],
+             'best_temp': LABELS[best_temp[c]], 'best_precip': LABELS[best_precip[c]]}
+            for c in range(len(self.crops))
+            if min(best_pollution[c], best_temp[c], best_precip[c]) >= 0
+        ]
+
+    # Query 4
+    def extreme_scores(self, extremes=EXTREMES):
+        """Per-(year, state) count of readings outside ``extremes``, 0 to 3."""
+        pollution, temp, precip = self.cell_climate
+        # NaN compares false, as NULL falls through to ELSE 0
+        score = ((pollution > extremes.pollution).astype(np.int64)
+                 + ((temp < extremes.temp[0]) | (temp > extremes.temp[1]))
+                 + ((precip <= extremes.precip[0]) | (precip > extremes.precip[1])))
+        return score.reshape(self.years.size, len(self.states))
+
+    def resilient_crops(self, extremes=EXTREMES):
+        """Query 4's leaderboard for any ``Extremes``, highest mean yield first.
+
+        Sums the per-cell yield totals over the cells that score at least
+        ``extremes.min_score``, so sweeping thresholds never revisits crop rows.
+        """
+        in_extremes = self.extreme_scores(extremes).ravel() >= extremes.min_score
+        counts = self.cell_yield_rows[:, in_extremes].sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.cell_yield_sums[:, in_extremes].sum(axis=1) / counts
+        resilient = np.flatnonzero(counts > 1)
+        resilient = resilient[np.argsort(-means[resilient], kind='stable')]
+        return [{'crop': self.crops[c], 'avg_yield_in_extremes': pg_round(means[c], 2)} for c in resilient]
+
+    def _ranges(self, values, present, digits, low, high):
+        """Per-crop min/max of a per-state value over the states each crop grows in."""
+        grown = self._crop_states(CLIMATE_YEARS) & present
+        masked = np.where(grown, values, np.nan)
+        # fmin/fmax skip NaN like MIN/MAX skip NULL; NaN only when every value is
+        lows = np.fmin.reduce(masked, axis=1, initial=np.nan)
+        highs = np.fmax.reduce(masked, axis=1, initial=np.nan)
+        return [{'crop': self.crops[c], low: pg_round(lows[c], digits), high: pg_round(highs[c], digits)}
+                for c in np.flatnonzero(grown.any(axis=1))]
+
+    # Query 5
+    def _pollution_ranges(self):
+        window = self._window(CLIMATE_YEARS)
+        rows = self.pollution_rows[window].sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            index = (self.pollution_sums[:, window].sum(axis=1) / rows).sum(axis=0)
+        return self._ranges(index, rows > 0, 2, 'min_pollution_index', 'max_pollution_index')
+
+    # Query 6
+    def _best_regions(self):
+        regions = sorted(set(REGIONS.values()))
+        state_region = np.array([regions.index(REGIONS[s]) if s in REGIONS else -1 for s in self.states],
+                                dtype=np.int64)
+        region = state_region[self.crop_state]
+        means, counts = self._yield_means(region >= 0, self.crop_code, len(self.crops),
+                                          region, len(regions))
+        best = _best(means, counts)
+        return [{'crop': self.crops[c], 'best_region': regions[best[c]], 'avg_yield': pg_round(means[c, best[c]], 2)}
+                for c in np.flatnonzero(best >= 0)]
+
+    # Query 7
+    def _precip_ranges(self):
+        window = self._window(CLIMATE_YEARS)
+        events = self.precip_events[window]
+        present = ~np.isnan(events).all(axis=0)
+        total = np.nansum(events, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            precip = np.where(total > 0, self.precip_sum[window].sum(axis=0) / total, np.nan)
+        return self._ranges(precip, present, 2, 'min_precip_mm', 'max_precip_mm')
+
+    # Query 8
+    def _temperature_ranges(self):
+        yearly = self._temp_avg()[self._window(CLIMATE_YEARS)]
+        present = ~np.isnan(yearly).all(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            state_avg = np.nansum(yearly, axis=0) / (~np.isnan(yearly)).sum(axis=0)
+        return self._ranges(state_avg, present, 1, 'min_temp_f', 'max_temp_f')
+
+    # Query 9
+    def _best_crop_by_season(self):
+        means, counts = self._yield_means(self.crop_season >= 0, self.crop_season, len(self.seasons),
+                                          self.crop_code, len(self.crops))
+        best = _best(means, counts)
+        return [{'season': self.seasons[s], 'best_crop': self.crops[best[s]],
+                 'avg_yield_kg_per_acre': pg_round(means[s, best[s]], 2)}
+                for s in np.flatnonzero(best >= 0)]
+
+    # Query 10
+    def _best_season_by_crop(self):
+        means, counts = self._yield_means(self.crop_season >= 0, self.crop_code, len(self.crops),
+                                          self.crop_season, len(self.seasons))
+        best = _best(means, counts)
+        return [{'crop': self.crops[c], 'best_season_to_plant': self.seasons[best[c]],
+                 'avg_yield_kg_per_acre': pg_round(means[c, best[c]], 2)}
+                for c in np.flatnonzero(best >= 0)]
+
+    def query(self, name, state=None):
+        """Rows of ``name`` (``'query1'`` to ``'query10'``); ``state`` is for query 1.
+
+        Rows are shared between calls, so treat them as read-only.
+        """
+        if name == 'query1':
+            profile = self.profiles.get(state.upper() if state else None)
+            return [profile] if profile else []
+        return self.results[name]
+
+
+def _matches(expected, actual):
+    if isinstance(expected, decimal.Decimal) and isinstance(actual, decimal.Decimal):
+        # One unit in the last place covers a different summation order
+        unit = decimal.Decimal(1).scaleb(min(expected.as_tuple().exponent, actual.as_tuple().exponent))
+        return abs(expected - actual) <= unit
+    return expected == actual
+
+
+def _differences(name, expected, actual):
+    def key(row):
+        return tuple(str(value) for value in row.values())
+
+    expected, actual = sorted(expected, key=key), sorted(actual, key=key)
+    if len(expected) != len(actual):
+        return [f"{name}: {len(expected)} rows from SQL, {len(actual)} from the engine"]
+    return [f"{name}: SQL {e} != engine {a}" for e, a in zip(expected, actual)
+            if e.keys() != a.keys() or not all(_matches(e[k], a[k]) for k in e)]
+
+
+def verify(engine, conn):
+    """Compare every engine result with its SQL; returns ``{query: [difference, ...]}``.
+
+    Rows are compared as sets, since several queries order by values that tie.
+    Query 1 is checked for every state the engine knows. Query 3 is checked
+    against ``conditions.REFERENCE_SQL``, since ``best_conditions`` holds the
+    engine's own answer.
+    """
+    from .conditions import REFERENCE_SQL
+    from .queryspec import render
+
+    differences = {}
+    with conn.cursor() as cur:
+        def sql_rows(sql, params=None):
+            cur.execute(sql, params)
+            columns = [col.name for col in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+        state_sql = render('query1', state='%s')
+        differences['query1'] = [
+            difference for state in engine.states
+            for difference in _differences(f'query1 {state}', sql_rows(state_sql, (state,)),
+                                           engine.query('query1', state))
+        ]
+        for name in engine.results:
+            sql = REFERENCE_SQL if name == 'query3' else render(name)
+            differences[name] = _differences(name, sql_rows(sql), engine.query(name))
+    conn.rollback()
+    return differences
@@ -0,0 +1,87 @@
+"""The ``crop_envelope`` table behind ``/crop-envelope`` and ``/search``.
+
+One row per crop with its best region (query 6) and the temperature,
+precipitation and pollution ranges of the states it grows in (queries 8, 7
+and 5), so the search page gets everything it filters on from one table
+instead of joining four responses in the browser. Built from the same
+``queryspec`` renderings the server serves, so the endpoint and the four
+single-range routes always agree.
+
+``/search`` turns each filter it is given into one predicate on a column of
+``ENVELOPE_INDEXES``, so with a growing crop catalog the planner can combine
+the matching indexes instead of scanning every crop.
+
+Rebuilt at the end of every load in one transaction, like ``state_profile``,
+and analyzed so the planner's row estimates follow the rebuilt contents.
+"""
+
+from .queryspec import QUERY_SPECS, render
+
+ENVELOPE_TABLE = 'crop_envelope'
+ENVELOPE_QUERIES = ('query5', 'query6', 'query7', 'query8')
+# Tables and views the four queries read
+ENVELOPE_SOURCES = tuple(dict.fromkeys(source for name in ENVELOPE_QUERIES
+                                       for source in QUERY_SPECS[name].reads))
+
+ENVELOPE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {ENVELOPE_TABLE} (
+    crop TEXT PRIMARY KEY,
+    best_region TEXT,
+    avg_yield NUMERIC,
+    min_temp_f NUMERIC,
+    max_temp_f NUMERIC,
+    min_precip_mm NUMERIC,
+    max_precip_mm NUMERIC,
+    min_pollution_index NUMERIC,
+    max_pollution_index NUMERIC
+);
+"""
+
+# Index name -> column; the region and every range column /search filters on
+ENVELOPE_INDEXES = {
+    f'idx_{ENVELOPE_TABLE}_{column}': column
+    for column in ('best_region', 'min_temp_f', 'max_temp_f', 'min_precip_mm', 'max_precip_mm',
+                   'min_pollution_index', 'max_pollution_index')
+}
+
+
+def _subquery(sql):
+    return sql.strip().rstrip(';')
+
+
+ENVELOPE_SQL = f"""
+INSERT INTO {ENVELOPE_TABLE}
+SELECT
+  r.crop,
+  r.best_region,
+  r.avg_yield,
+  t.min_temp_f,
+  t.max_temp_f,
+  p.min_precip_mm,
+  p.max_precip_mm,
+  x.min_pollution_index,
+  x.max_pollution_index
+FROM ({_subquery(render('query6'))}) r
+LEFT JOIN ({_subquery(render('query8'))}) t ON t.crop = r.crop
+LEFT JOIN ({_subquery(render('query7'))}) p ON p.crop = r.crop
+LEFT JOIN ({_subquery(render('query5'))}) x ON x.crop = r.crop
+"""
+
+
+def build_crop_envelope(conn):
+    """Replace the contents of ``crop_envelope``; returns the number of crops."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(%s::text[]) AS name",
+                    (list(ENVELOPE_SOURCES),))
+        if not cur.fetchone()[0]:
+            return 0
+        cur.execute(ENVELOPE_DDL)
+        for name, column in ENVELOPE_INDEXES.items():
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {ENVELOPE_TABLE} ({column})")
+        cur.execute(f"DELETE FROM {ENVELOPE_TABLE}")
+        cur.execute(ENVELOPE_SQL)
+        rows = cur.rowcount
+        cur.execute(f"ANALYZE {ENVELOPE_TABLE}")
+    conn.commit()
+    print(f"{ENVELOPE_TABLE}: {rows} crops")
+    return rows
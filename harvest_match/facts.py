@@ -0,0 +1,182 @@
+"""The ``state_year_climate`` fact table.
+
+One row per (year, UPPER(state)) with the per-pollutant means, pollution
+score, temperature and precipitation that the complex queries otherwise
+re-aggregate from the raw tables. It is computed in Python from the cleaned
+frames while they stream into COPY, and each source only updates its own
+columns, so loading a subset of datasets keeps the others intact.
+
+Row counts are stored next to every average so wider windows can be
+re-weighted exactly: ``SUM(avg_temp * temp_rows) / SUM(temp_rows)`` equals
+``AVG(average_temp)`` over the raw rows.
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from .bulk_load import load
+from .states import state_ids
+
+FACT_TABLE = 'state_year_climate'
+# Default year window of the queries and tables built on the facts
+CLIMATE_YEARS = (2016, 2022)
+
+FACT_DDL = f"""
+CREATE TABLE IF NOT EXISTS {FACT_TABLE} (
+    year INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    state_id SMALLINT,
+    avg_co DOUBLE PRECISION,
+    avg_no2 DOUBLE PRECISION,
+    avg_so2 DOUBLE PRECISION,
+    avg_o3 DOUBLE PRECISION,
+    pollution_score DOUBLE PRECISION
+        GENERATED ALWAYS AS (avg_co + avg_no2 + avg_so2 + avg_o3) STORED,
+    pollution_rows BIGINT,
+    avg_temp DOUBLE PRECISION,
+    temp_rows BIGINT,
+    avg_precip DOUBLE PRECISION,
+    precip_events BIGINT,
+    PRIMARY KEY (year, state)
+);
+"""
+
+
+@dataclass(frozen=True)
+class FactSource:
+    year: str
+    state: str
+    # fact column -> source column
+    measures: dict
+    count: str
+
+
+FACT_SOURCES = {
+    'pollution_data': FactSource(
+        year='Year',
+        state='State',
+        measures={'avg_co': 'CO Mean', 'avg_no2': 'NO2 Mean',
+                  'avg_so2': 'SO2 Mean', 'avg_o3': 'O3 Mean'},
+        count='pollution_rows',
+    ),
+    'temperature_data': FactSource(
+        year='year',
+        state='state',
+        measures={'avg_temp': 'average_temp'},
+        count='temp_rows',
+    ),
+    'weather_events': FactSource(
+        year='start_date',
+        state='state',
+        measures={'avg_precip': 'precipitation'},
+        count='precip_events',
+    ),
+}
+
+
+class FactAccumulator:
+    """Running per-(year, state) sums and counts for one source table."""
+
+    def __init__(self, table):
+        self.table = table
+        self.source = FACT_SOURCES[table]
+        self._sums = None
+        self._counts = None
+
+    def add(self, df):
+        src = self.source
+        df = df[df[src.state].notna()]
+        year = df[src.year]
+        if not pd.api.types.is_numeric_dtype(year):
+            year = pd.to_datetime(year).dt.year
+        keys = [year.astype('int64').rename('year'),
+                df[src.state].astype(str).str.upper().rename('state')]
+        values = df[list(src.measures.values())].astype('float64')
+        grouped = values.groupby(keys, observed=True)
+        sums, counts = grouped.sum(), grouped.count()
+        if self._sums is None:
+            self._sums, self._counts = sums, counts
+        else:
+            self._sums = self._sums.add(sums, fill_value=0)
+            self._counts = self._counts.add(counts, fill_value=0)
+
+    def consume(self, frames):
+        """Pass ``frames`` through unchanged, aggregating each on the way."""
+        for df in frames:
+            self.add(df)
+            yield df
+
+    def result(self):
+        """Averages per (year, state) plus the row count behind them."""
+        src = self.source
+        columns = ['year', 'state', 'state_id', *src.measures, src.count]
+        if self._sums is None:
+            return pd.DataFrame(columns=columns)
+        means = (self._sums / self._counts).rename(columns={v: k for k, v in src.measures.items()})
+        first_measure = next(iter(src.measures.values()))
+        means[src.count] = self._counts[first_measure].astype('int64')
+        means = means.reset_index()
+        means['state_id'] = state_ids(means['state'])
+        return means[columns]
+
+
+def create_fact_table(conn):
+    """Create ``state_year_climate`` if needed.
+
+    Run once before the loads start, so concurrent loaders never race on it.
+    """
+    with conn.cursor() as cur:
+        cur.execute(FACT_DDL)
+    conn.commit()
+
+
+def accumulator_for(table):
+    return FactAccumulator(table) if table in FACT_SOURCES else None
+
+
+def update_facts(cur, accumulator, replace=True):
+    """Write one source's columns into the fact table.
+
+    With ``replace`` the source's previous values are cleared first (a full
+    reload); otherwise only the (year, state) rows present are overwritten.
+    The table must exist (``create_fact_table``).
+    """
+    src = accumulator.source
+    columns = ['state_id', *src.measures, src.count]
+    if replace:
+        # Only the rows this source filled need the write (and its row locks)
+        cur.execute(f"UPDATE {FACT_TABLE} SET " + ', '.join(f"{c} = NULL" for c in columns[1:])
+                    + f" WHERE {src.count} IS NOT NULL")
+
+    facts = accumulator.result().astype(object)
+    rows = list(facts.where(facts.notna(), None).itertuples(index=False, name=None))
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in columns)
+    execute_values(
+        cur,
+        f"INSERT INTO {FACT_TABLE} (year, state, {', '.join(columns)}) VALUES %s "
+        f"ON CONFLICT (year, state) DO UPDATE SET {updates}",
+        rows,
+    )
+    # Rows no source covers any more
+    every_count = ' AND '.join(f"{s.count} IS NULL" for s in FACT_SOURCES.values())
+    cur.execute(f"DELETE FROM {FACT_TABLE} WHERE {every_count}")
+    return len(rows)
+
+
+def load_with_facts(conn, table, frames, fmt='csv'):
+    """``bulk_load.load`` that also refreshes this table's fact columns.
+
+    The table and its fact rows are committed together.
+    """
+    accumulator = accumulator_for(table)
+    if accumulator is None:
+        return load(conn, table, frames, fmt)
+
+    rows = load(conn, table, accumulator.consume(frames), fmt, commit=False)
+    with conn.cursor() as cur:
+        facts = update_facts(cur, accumulator)
+    conn.commit()
+    print(f"{FACT_TABLE}: {facts} (year, state) rows from {table}")
+    return rows
@@ -0,0 +1,132 @@
+"""Idempotent DDL for the indexes and materialized views the queries read.
+
+Every object is declared once (indexes below, views in ``views``) and created
+with ``IF NOT EXISTS``, so ``queries/optimized_queries.py`` is left with pure
+SELECTs and applying the migrations costs nothing when all objects exist.
+
+Each view is tagged with a hash of its definition (as the view's comment), so
+a view whose query changed, or one listed in ``views.RETIRED_VIEWS``, is
+dropped and rebuilt on the next apply rather than silently kept; indexes in
+``RETIRED_INDEXES`` are dropped too.
+
+A full reload drops its table with ``CASCADE``, taking the dependent indexes
+and views with it; the loaders apply the migrations again afterwards, so the
+indexes are built once over the loaded rows instead of maintained during COPY.
+On the year-partitioned tables an index is declared on the parent and built
+on every partition.
+"""
+
+import hashlib
+import time
+
+from .views import MATERIALIZED_VIEWS, RETIRED_VIEWS, key_index, key_index_sql
+
+# Index name -> (table, indexed expressions)
+INDEXES = {
+    'idx_pollution_state_id': ('pollution_data', 'state_id'),
+    'idx_temperature_state_id': ('temperature_data', 'state_id'),
+    'idx_crop_state_id': ('crop_data', 'state_id'),
+    'idx_pollution_year': ('pollution_data', '"Year"'),
+    'idx_temperature_year': ('temperature_data', 'year'),
+    'idx_crop_year': ('crop_data', 'year'),
+    'idx_crop_state_id_yield': ('crop_data', 'state_id, crop, year, yield_kg_per_acre'),
+    'idx_crop_state_id_year': ('crop_data', 'state_id, year, crop'),
+}
+
+# Indexes no query uses any more; dropped by ``apply_migrations``
+RETIRED_INDEXES = (
+    # Functional indexes for the UPPER(state) joins, replaced by state_id
+    'idx_pollution_state_upper', 'idx_temperature_state_upper', 'idx_crop_state_upper',
+    'idx_crop_yield_multi', 'idx_crop_state_year',
+)
+
+
+def index_sql(name):
+    table, columns = INDEXES[name]
+    return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+
+
+def view_version(name):
+    return hashlib.sha256(MATERIALIZED_VIEWS[name].query.encode()).hexdigest()[:16]
+
+
+def view_sql(name):
+    return (f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {MATERIALIZED_VIEWS[name].query};"
+            f"COMMENT ON MATERIALIZED VIEW {name} IS '{view_version(name)}'")
+
+
+def existing_relations(cur):
+    cur.execute(
+        "SELECT c.relname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = current_schema()"
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+def view_versions(cur):
+    """``{name: comment}`` for the materialized views in the current schema."""
+    cur.execute(
+        "SELECT matviewname, obj_description(format('%I', matviewname)::regclass, 'pg_class') "
+        "FROM pg_matviews WHERE schemaname = current_schema()"
+    )
+    return dict(cur.fetchall())
+
+
+def drop_stale_views(cur):
+    """Drop retired views and views built from an older definition."""
+    dropped = []
+    for name, version in view_versions(cur).items():
+        stale = name in MATERIALIZED_VIEWS and version != view_version(name)
+        if stale or name in RETIRED_VIEWS:
+            # CASCADE takes dependent views along; they are recreated below
+            cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name} CASCADE")
+            dropped.append(name)
+    return dropped
+
+
+def migrations():
+    """``(name, relations it needs, sql)`` for every object, in creation order.
+
+    Indexes come first, then the views, each followed by
+    the unique index that lets it be refreshed concurrently.
+    """
+    for name, (table, _) in INDEXES.items():
+        yield name, (table,), index_sql(name)
+    for name, view in MATERIALIZED_VIEWS.items():
+        yield name, view.sources, view_sql(name)
+        if view.key:
+            yield key_index(name), (name,), key_index_sql(name)
+
+
+def apply_migrations(conn):
+    """Create every missing index and view whose base tables are loaded.
+
+    Returns the names of the objects created.
+    """
+    created = []
+    with conn.cursor() as cur:
+        for name in drop_stale_views(cur):
+            print(f"{name}: dropped (retired or redefined)")
+        for name in RETIRED_INDEXES:
+            cur.execute(f"DROP INDEX IF EXISTS {name}")
+        present = existing_relations(cur)
+        for name, tables, sql in migrations():
+            if name in present or not present.issuperset(tables):
+                continue
+            start = time.perf_counter()
+            cur.execute(sql)
+            present.add(name)
+            created.append(name)
+            print(f"{name}: created in {time.perf_counter() - start:.1f}s")
+    conn.commit()
+    return created
+
+
+def drop_migrations(conn):
+    """Drop every declared view and index, e.g. to time a cold ``apply_migrations``."""
+    with conn.cursor() as cur:
+        for name in (*MATERIALIZED_VIEWS, *RETIRED_VIEWS):
+            cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name} CASCADE")
+        for name in (*INDEXES, *RETIRED_INDEXES):
+            cur.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
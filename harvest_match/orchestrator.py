@@ -0,0 +1,128 @@
+"""Run the dataset pipelines concurrently.
+
+Extract/transform stages run side by side in a process pool, one fresh worker
+per dataset so its peak RSS is its own. Each finished stage is spilled to a
+staging file (or the Parquet stage when a cache directory is given) and handed
+to a small thread pool that loads it over its own connection, so at most
+``load_concurrency`` COPYs hit the database at once.
+A full refresh then takes about as long as the slowest dataset.
+"""
+
+import os
+import pickle
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from .datasets import DATASETS, extract_transform
+from .facts import create_fact_table, load_with_facts
+from .publish import publish
+from .states import load_states
+
+
+@dataclass
+class StageResult:
+    dataset: str
+    stage: str
+    seconds: float
+    peak_rss_mb: float
+    rows: int
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return rss / 2**20 if sys.platform == 'darwin' else rss / 2**10
+
+
+def _transform_stage(name, data_dir, staging_dir, cache_dir=None):
+    start = time.perf_counter()
+    if cache_dir is not None:
+        from .staging import ensure_stage, staged_rows
+        path = ensure_stage(DATASETS[name], data_dir, cache_dir)
+        rows = staged_rows(path)
+    else:
+        path = os.path.join(staging_dir, f'{name}.pkl')
+        rows = 0
+        with open(path, 'wb') as f:
+            for df in extract_transform(DATASETS[name], data_dir):
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+                rows += len(df)
+    elapsed = time.perf_counter() - start
+    return path, StageResult(name, 'transform', elapsed, peak_rss_mb(), rows)
+
+
+def _staged_frames(name, path):
+    if os.path.isdir(path):
+        from .staging import read_stage
+        yield from read_stage(DATASETS[name], path)
+        return
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _load_stage(name, path, fmt):
+    from .db import connect
+
+    start = time.perf_counter()
+    conn = connect()
+    try:
+        rows = load_with_facts(conn, DATASETS[name].table, _staged_frames(name, path), fmt)
+    finally:
+        conn.close()
+    # Loads share the parent process, so this is the parent's peak
+    return StageResult(name, 'load', time.perf_counter() - start, peak_rss_mb(), rows)
+
+
+def format_report(results, total_seconds):
+    lines = [f"{'dataset':<12} {'stage':<10} {'seconds':>9} {'peak MB':>9} {'rows':>12}"]
+    for r in sorted(results, key=lambda r: (r.dataset, r.stage != 'transform')):
+        lines.append(f"{r.dataset:<12} {r.stage:<10} {r.seconds:>9.2f} {r.peak_rss_mb:>9.1f} {r.rows:>12,}")
+    stage_sum = sum(r.seconds for r in results)
+    lines.append(f"wall time {total_seconds:.2f}s (sum of stages {stage_sum:.2f}s)")
+    return '\n'.join(lines)
+
+
+def run_parallel(names, data_dir=None, fmt='csv', jobs=None, load_concurrency=2, cache_dir=None,
+                 snapshot_dir=None):
+    """Transform ``names`` in parallel and load each as soon as it is ready."""
+    from .db import connect
+
+    start = time.perf_counter()
+    conn = connect()
+    try:
+        load_states(conn)
+        create_fact_table(conn)
+    finally:
+        conn.close()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='harvest_match_') as staging_dir, \
+            ProcessPoolExecutor(max_workers=jobs or len(names), max_tasks_per_child=1) as transforms, \
+            ThreadPoolExecutor(max_workers=load_concurrency) as loads:
+        pending = [transforms.submit(_transform_stage, name, data_dir, staging_dir, cache_dir)
+                   for name in names]
+        load_futures = []
+        for future in as_completed(pending):
+            path, result = future.result()
+            results.append(result)
+            load_futures.append(loads.submit(_load_stage, result.dataset, path, fmt))
+        for future in as_completed(load_futures):
+            results.append(future.result())
+
+    conn = connect()
+    try:
+        publish(conn, snapshot_dir)
+    finally:
+        conn.close()
+
+    print(format_report(results, time.perf_counter() - start))
+    return results
@@ -0,0 +1,90 @@
+"""The ``state_profile`` table behind ``/state/:state``.
+
+One row per state with the values query 1 returns (pollutant averages,
+precipitation, temperature and dominant crop over ``PROFILE_YEARS``), already
+rounded the way the endpoint serves them, so a map click is a primary-key
+lookup. The climate columns are re-weighted from ``state_year_climate``
+rather than re-aggregated from the raw tables; only the dominant crop reads
+``crop_data``. As in query 1, only states with pollution data get a row.
+
+Rebuilt at the end of every load in one transaction, so readers see either
+the old profile or the new one.
+"""
+
+from .facts import FACT_TABLE
+
+PROFILE_TABLE = 'state_profile'
+PROFILE_YEARS = (2016, 2022)
+
+PROFILE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {PROFILE_TABLE} (
+    state TEXT PRIMARY KEY,
+    state_id SMALLINT,
+    avg_co NUMERIC,
+    avg_no2 NUMERIC,
+    avg_so2 NUMERIC,
+    avg_o3 NUMERIC,
+    avg_precipitation NUMERIC,
+    avg_temp NUMERIC,
+    dominant_crop TEXT
+);
+"""
+
+PROFILE_SQL = f"""
+INSERT INTO {PROFILE_TABLE}
+WITH climate AS (
+  SELECT
+    state,
+    MAX(state_id) AS state_id,
+    SUM(avg_co * pollution_rows) / SUM(pollution_rows) AS avg_co,
+    SUM(avg_no2 * pollution_rows) / SUM(pollution_rows) AS avg_no2,
+    SUM(avg_so2 * pollution_rows) / SUM(pollution_rows) AS avg_so2,
+    SUM(avg_o3 * pollution_rows) / SUM(pollution_rows) AS avg_o3,
+    SUM(avg_precip * precip_events) / NULLIF(SUM(precip_events), 0) AS avg_precipitation,
+    SUM(avg_temp * temp_rows) / NULLIF(SUM(temp_rows), 0) AS avg_temp
+  FROM {FACT_TABLE}
+  WHERE year BETWEEN %(first)s AND %(last)s
+  GROUP BY state
+  HAVING SUM(pollution_rows) > 0
+),
+crop_ranked AS (
+  SELECT
+    state_id,
+    crop,
+    ROW_NUMBER() OVER (
+      PARTITION BY state_id
+      ORDER BY AVG(yield_kg_per_acre) DESC
+    ) AS rank
+  FROM crop_data
+  WHERE year BETWEEN %(first)s AND %(last)s
+  GROUP BY state_id, crop
+)
+SELECT
+  c.state,
+  c.state_id,
+  ROUND(c.avg_co::numeric, 4),
+  ROUND(c.avg_no2::numeric, 4),
+  ROUND(c.avg_so2::numeric, 4),
+  ROUND(c.avg_o3::numeric, 4),
+  ROUND(c.avg_precipitation::numeric, 2),
+  ROUND(c.avg_temp::numeric, 2),
+  r.crop
+FROM climate c
+LEFT JOIN crop_ranked r ON r.state_id = c.state_id AND r.rank = 1
+"""
+
+
+def build_state_profile(conn, years=PROFILE_YEARS):
+    """Replace the contents of ``state_profile``; returns the number of states."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL AND to_regclass('crop_data') IS NOT NULL",
+                    (FACT_TABLE,))
+        if not cur.fetchone()[0]:
+            return 0
+        cur.execute(PROFILE_DDL)
+        cur.execute(f"DELETE FROM {PROFILE_TABLE}")
+        cur.execute(PROFILE_SQL, {'first': years[0], 'last': years[1]})
+        rows = cur.rowcount
+    conn.commit()
+    print(f"{PROFILE_TABLE}: {rows} states")
+    return rows
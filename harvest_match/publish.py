@@ -0,0 +1,57 @@
+"""Steps that run once a load has finished.
+
+``publish`` brings the indexes and materialized views up to date, rebuilds
+``state_profile``, ``crop_envelope`` and ``best_conditions``, optionally exports the static JSON snapshots (see
+``snapshots``) and then bumps the data version: a new token in the
+one-row ``data_version`` table plus a ``NOTIFY`` on ``DATA_VERSION_CHANNEL``.
+The Express server listens on that channel and drops its response cache, so
+cached responses never outlive the data they were computed from. Snapshots are
+written under the same token before the notification goes out, and the server
+only serves a snapshot set whose token is the current one.
+"""
+
+import uuid
+
+from .conditions import build_best_conditions
+from .envelopes import build_crop_envelope
+from .migrations import apply_migrations
+from .profiles import build_state_profile
+
+DATA_VERSION_CHANNEL = 'harvest_match_data_version'
+
+VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    token TEXT NOT NULL,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+
+def bump_data_version(conn, token=None):
+    """Record a new data version and notify listeners; returns the token."""
+    token = token or uuid.uuid4().hex
+    with conn.cursor() as cur:
+        cur.execute(VERSION_DDL)
+        cur.execute(
+            "INSERT INTO data_version (token) VALUES (%s) "
+            "ON CONFLICT (id) DO UPDATE SET token = EXCLUDED.token, loaded_at = now()",
+            (token,),
+        )
+        # Delivered on commit, together with the new token
+        cur.execute("SELECT pg_notify(%s, %s)", (DATA_VERSION_CHANNEL, token))
+    conn.commit()
+    print(f"data version {token}")
+    return token
+
+
+def publish(conn, snapshot_dir=None):
+    apply_migrations(conn)
+    build_state_profile(conn)
+    build_crop_envelope(conn)
+    build_best_conditions(conn)
+    token = uuid.uuid4().hex
+    if snapshot_dir:
+        from .snapshots import export_snapshots
+        export_snapshots(conn, snapshot_dir, token)
+    return bump_data_version(conn, token)
@@ -0,0 +1,480 @@
+"""Queries 1-10, each declared once and rendered to SQL.
+
+Every ``QuerySpec`` names what the query measures, the rows it returns, how
+it ranks them and what it reads, next to its SQL template. ``render`` fills in
+the year window and parameters; ``queries/optimized_queries.py``, the snapshot
+export and the Express routes (through ``server/queries.json``, written by
+``python -m harvest_match --export-queries``) all run that output, so a
+change here reaches every caller. ``queries/before_optimization_queries.py``
+stays as written: it is the baseline ``benchmarks.queries`` measures against.
+
+A window can move as far as the precomputed objects a query reads allow:
+anywhere inside a year-keyed materialized view's years, nowhere for views
+without a year column and for the tables ``publish`` rebuilds. Past that, a
+spec with a ``window_template`` reads ``state_year_climate`` and the base
+tables instead, whose yearly partitions (see ``bulk_load.PARTITION_KEYS``)
+keep the scan to the years asked for. ``plan`` lists the objects a rendering
+reads, grouped by how each is built.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+from .facts import CLIMATE_YEARS, FACT_TABLE
+from .profiles import PROFILE_YEARS
+from .views import MATERIALIZED_VIEWS
+
+# Tables rebuilt by ``publish``, with the one window each is computed for
+PRECOMPUTED_TABLES = {
+    'state_profile': PROFILE_YEARS,
+    # Written from engine.AnalyticsEngine over the default climate window
+    'best_conditions': CLIMATE_YEARS,
+}
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    title: str
+    route: str
+    # What is aggregated, the columns identifying a result row, and its order
+    metric: str
+    grain: tuple
+    ranking: str
+    # Tables and materialized views the SQL reads
+    reads: tuple
+    # SQL with {first} and {last} for the year window and {name} for each parameter
+    template: str
+    # Default inclusive year window; None for queries over every year
+    years: tuple = None
+    # Parameter -> default placeholder
+    params: dict = field(default_factory=dict)
+    # The same query over base and fact tables, for windows ``reads`` do not cover
+    window_template: str = None
+    window_reads: tuple = ()
+
+
+# Query 4: each crop row with its (year, state)'s climate, then the scoring
+_CROP_ENV = f"""
+WITH crop_env AS (
+  SELECT
+    c.crop,
+    c.yield_kg_per_acre,
+    f.pollution_score AS pollution,
+    f.avg_temp AS average_temp,
+    f.avg_precip
+  FROM crop_data c
+  LEFT JOIN {FACT_TABLE} f ON c.year = f.year AND c.state_id = f.state_id
+  WHERE c.year BETWEEN {{first}} AND {{last}}
+),
+"""
+_RESILIENCE = """classified AS (
+  SELECT
+    crop,
+    yield_kg_per_acre,
+    CASE
+      WHEN pollution > 16 THEN 1 ELSE 0
+    END +
+    CASE
+      WHEN average_temp < 20 OR average_temp > 80 THEN 1 ELSE 0
+    END +
+    CASE
+      WHEN avg_precip <= 0.01 OR avg_precip > 0.16 THEN 1 ELSE 0
+    END AS extreme_score
+  FROM crop_env
+),
+crop_resilience AS (
+  SELECT
+    crop,
+    AVG(yield_kg_per_acre) FILTER (WHERE extreme_score >= 2) AS avg_yield_in_extremes
+  FROM classified
+  GROUP BY crop
+  HAVING COUNT(*) FILTER (WHERE extreme_score >= 2) > 1
+)
+
+SELECT
+  crop,
+  ROUND(avg_yield_in_extremes::numeric, 2) AS avg_yield_in_extremes
+FROM crop_resilience
+ORDER BY avg_yield_in_extremes DESC"""
+
+
+QUERY_SPECS = {
+    'query1': QuerySpec(
+        title='COMPLEX QUERY 1: HISTORICAL AVERAGES BY STATE',
+        route='/state/:state',
+        metric='pollutant, precipitation and temperature averages; highest-yield crop',
+        grain=('state',),
+        ranking='dominant crop by average yield',
+        reads=('state_profile',),
+        years=PROFILE_YEARS,
+        params={'state': "'STATE NAME'"},
+        template="""
+SELECT
+  state,
+  avg_co,
+  avg_no2,
+  avg_so2,
+  avg_o3,
+  avg_precipitation,
+  avg_temp,
+  dominant_crop
+FROM state_profile
+WHERE state = {state}""",
+    ),
+    'query2': QuerySpec(
+        title='COMPLEX QUERY 2: AVG CROP YIELD BASED ON AVG POLLUTION, PRECIPITATION, AND TEMPERATURE',
+        route='/crop-trends',
+        metric='average yield beside pollutant, precipitation and temperature averages',
+        grain=('year', 'state'),
+        ranking='state, then year',
+        reads=('crop_yearly_mv', FACT_TABLE),
+        years=MATERIALIZED_VIEWS['crop_yearly_mv'].years,
+        template=f"""
+SELECT
+  c.year,
+  c.state,
+  ROUND(c.avg_yield::numeric, 2) AS avg_yield,
+  ROUND(f.avg_co::numeric, 4) AS avg_co,
+  ROUND(f.avg_no2::numeric, 4) AS avg_no2,
+  ROUND(f.avg_so2::numeric, 4) AS avg_so2,
+  ROUND(f.avg_o3::numeric, 4) AS avg_o3,
+  ROUND(f.avg_precip::numeric, 2) AS avg_precipitation,
+  ROUND(f.avg_temp::numeric, 2) AS avg_temp
+FROM crop_yearly_mv c
+LEFT JOIN {FACT_TABLE} f ON c.year = f.year AND c.state_id = f.state_id
+WHERE c.year BETWEEN {{first}} AND {{last}}
+ORDER BY c.state, c.year""",
+        window_reads=('crop_data', FACT_TABLE),
+        window_template=f"""
+WITH crop_yearly AS (
+  SELECT
+    year,
+    UPPER(state) AS state,
+    state_id,
+    AVG(yield_kg_per_acre) AS avg_yield
+  FROM crop_data
+  WHERE year BETWEEN {{first}} AND {{last}}
+  GROUP BY year, UPPER(state), state_id
+)
+SELECT
+  c.year,
+  c.state,
+  ROUND(c.avg_yield::numeric, 2) AS avg_yield,
+  ROUND(f.avg_co::numeric, 4) AS avg_co,
+  ROUND(f.avg_no2::numeric, 4) AS avg_no2,
+  ROUND(f.avg_so2::numeric, 4) AS avg_so2,
+  ROUND(f.avg_o3::numeric, 4) AS avg_o3,
+  ROUND(f.avg_precip::numeric, 2) AS avg_precipitation,
+  ROUND(f.avg_temp::numeric, 2) AS avg_temp
+FROM crop_yearly c
+LEFT JOIN {FACT_TABLE} f ON c.year = f.year AND c.state_id = f.state_id
+ORDER BY c.state, c.year""",
+    ),
+    'query3': QuerySpec(
+        title='COMPLEX QUERY 3: DETERMINES BEST CONDITIONS TO GROW EACH CROP',
+        route='/best-conditions',
+        metric='average yield per pollution, temperature and precipitation tercile',
+        grain=('crop',),
+        ranking='best tercile of each metric',
+        reads=('best_conditions',),
+        years=PRECOMPUTED_TABLES['best_conditions'],
+        template="""
+SELECT
+  crop,
+  best_pollution,
+  best_temp,
+  best_precip
+FROM best_conditions
+ORDER BY crop""",
+    ),
+    'query4': QuerySpec(
+        title='COMPLEX QUERY 4: MOST CLIMATE RESILIENT CROPS --> LEAST CLIMATE RESILIENT',
+        route='/best-climate-resilient-crops',
+        metric='average yield in (year, state)s with at least two extreme readings',
+        grain=('crop',),
+        ranking='average yield in extremes, descending',
+        reads=('crop_data', FACT_TABLE),
+        years=CLIMATE_YEARS,
+        template=_CROP_ENV + _RESILIENCE,
+    ),
+    'query5': QuerySpec(
+        title='SIMPLE QUERY 1: BEST CROPS TO PLANT BASED ON MIN/MAX POLLUTION',
+        route='/best-pollution-range-by-crop',
+        metric='range of state pollution indexes',
+        grain=('crop',),
+        ranking='crop',
+        reads=(FACT_TABLE, 'crop_data'),
+        years=CLIMATE_YEARS,
+        template=f"""
+WITH state_pollution_index AS (
+  SELECT
+    state_id,
+    SUM(pollution_score * pollution_rows) / SUM(pollution_rows) AS pollution_index
+  FROM {FACT_TABLE}
+  WHERE year BETWEEN {{first}} AND {{last}} AND pollution_rows > 0
+  GROUP BY state_id
+),
+crop_states AS (
+  SELECT DISTINCT state_id, crop
+  FROM crop_data
+  WHERE year BETWEEN {{first}} AND {{last}}
+),
+crop_pollution_joined AS (
+  SELECT
+    cs.crop,
+    spi.pollution_index
+  FROM crop_states cs
+  JOIN state_pollution_index spi ON cs.state_id = spi.state_id
+)
+SELECT
+  crop,
+  ROUND(MIN(pollution_index)::numeric, 2) AS min_pollution_index,
+  ROUND(MAX(pollution_index)::numeric, 2) AS max_pollution_index
+FROM crop_pollution_joined
+GROUP BY crop
+ORDER BY crop""",
+    ),
+    'query6': QuerySpec(
+        title='SIMPLE QUERY 2: BEST CROP TO PLANT BY REGION BASED ON YIELD',
+        route='/best-region-by-crop',
+        metric='average yield per region',
+        grain=('crop',),
+        ranking='region with the highest average yield',
+        reads=('crop_data', 'states'),
+        template="""
+WITH regional_yields AS (
+  SELECT s.region, c.crop, AVG(c.yield_kg_per_acre) AS avg_yield
+  FROM crop_data c
+  JOIN states s ON c.state_id = s.state_id
+  GROUP BY s.region, c.crop
+),
+ranked AS (
+  SELECT crop, region, avg_yield,
+         ROW_NUMBER() OVER (PARTITION BY crop ORDER BY avg_yield DESC) AS rank
+  FROM regional_yields
+)
+SELECT crop, region AS best_region, ROUND(avg_yield::numeric, 2) AS avg_yield
+FROM ranked
+WHERE rank = 1
+ORDER BY crop""",
+    ),
+    'query7': QuerySpec(
+        title='SIMPLE QUERY 3: BEST CROP TO PLANT BASED ON MIN/MAX PRECIPITATION',
+        route='/best-precip-range-by-crop',
+        metric='range of state precipitation averages',
+        grain=('crop',),
+        ranking='crop',
+        reads=('crop_data', 'weather_avg_mv'),
+        years=MATERIALIZED_VIEWS['weather_avg_mv'].years,
+        template="""
+SELECT
+  c.crop,
+  ROUND(MIN(p.avg_precipitation)::numeric, 2) AS min_precip_mm,
+  ROUND(MAX(p.avg_precipitation)::numeric, 2) AS max_precip_mm
+FROM (
+  SELECT DISTINCT state_id, crop
+  FROM crop_data
+  WHERE year BETWEEN {first} AND {last}
+) c
+JOIN weather_avg_mv p ON c.state_id = p.state_id
+GROUP BY c.crop
+ORDER BY c.crop""",
+        window_reads=('crop_data', FACT_TABLE),
+        window_template=f"""
+WITH state_precip AS (
+  SELECT
+    state_id,
+    SUM(avg_precip * precip_events) / NULLIF(SUM(precip_events), 0) AS avg_precipitation
+  FROM {FACT_TABLE}
+  WHERE year BETWEEN {{first}} AND {{last}}
+  GROUP BY state_id
+)
+SELECT
+  c.crop,
+  ROUND(MIN(p.avg_precipitation)::numeric, 2) AS min_precip_mm,
+  ROUND(MAX(p.avg_precipitation)::numeric, 2) AS max_precip_mm
+FROM (
+  SELECT DISTINCT state_id, crop
+  FROM crop_data
+  WHERE year BETWEEN {{first}} AND {{last}}
+) c
+JOIN state_precip p ON c.state_id = p.state_id
+GROUP BY c.crop
+ORDER BY c.crop""",
+    ),
+    'query8': QuerySpec(
+        title='SIMPLE QUERY 4: BEST CROP TO PLANT BASED ON MIN/MAX TEMPERATURE',
+        route='/best-temp-range-by-crop',
+        metric='range of state temperature averages',
+        grain=('crop',),
+        ranking='crop',
+        reads=(FACT_TABLE, 'crop_data'),
+        years=CLIMATE_YEARS,
+        template=f"""
+WITH state_avg_temp AS (
+  -- The mean of the yearly state means
+  SELECT
+    state_id,
+    AVG(avg_temp) AS avg_temp_f
+  FROM {FACT_TABLE}
+  WHERE year BETWEEN {{first}} AND {{last}} AND temp_rows > 0
+  GROUP BY state_id
+),
+crop_states AS (
+  SELECT DISTINCT state_id, crop
+  FROM crop_data
+  WHERE year BETWEEN {{first}} AND {{last}}
+),
+crop_temp_joined AS (
+  SELECT
+    cs.crop,
+    sat.avg_temp_f
+  FROM crop_states cs
+  JOIN state_avg_temp sat ON cs.state_id = sat.state_id
+)
+SELECT
+  crop,
+  ROUND(MIN(avg_temp_f)::numeric, 1) AS min_temp_f,
+  ROUND(MAX(avg_temp_f)::numeric, 1) AS max_temp_f
+FROM crop_temp_joined
+GROUP BY crop
+ORDER BY crop""",
+    ),
+    'query9': QuerySpec(
+        title='SIMPLE QUERY 5: BEST CROP BY SEASON',
+        route='/best-crop-by-season',
+        metric='average yield per crop',
+        grain=('season',),
+        ranking='crop with the highest average yield',
+        reads=('crop_data',),
+        template="""
+WITH crop_season_yields AS (
+  SELECT
+    season,
+    crop,
+    AVG(yield_kg_per_acre) AS avg_yield,
+    ROW_NUMBER() OVER (
+      PARTITION BY season
+      ORDER BY AVG(yield_kg_per_acre) DESC
+    ) AS rank
+  FROM crop_data
+  WHERE season IS NOT NULL
+  GROUP BY season, crop
+)
+
+SELECT
+  season,
+  crop AS best_crop,
+  ROUND(avg_yield::numeric, 2) AS avg_yield_kg_per_acre
+FROM crop_season_yields
+WHERE rank = 1
+ORDER BY season""",
+    ),
+    'query10': QuerySpec(
+        title='SIMPLE QUERY 6: BEST SEASON FOR EACH CROP',
+        route='/best-season-for-crop',
+        metric='average yield per season',
+        grain=('crop',),
+        ranking='season with the highest average yield',
+        reads=('crop_data',),
+        template="""
+WITH crop_season_yields AS (
+  SELECT
+    crop,
+    season,
+    AVG(yield_kg_per_acre) AS avg_yield,
+    ROW_NUMBER() OVER (
+      PARTITION BY crop
+      ORDER BY AVG(yield_kg_per_acre) DESC
+    ) AS rank
+  FROM crop_data
+  WHERE season IS NOT NULL
+  GROUP BY crop, season
+)
+
+SELECT
+  crop,
+  season AS best_season_to_plant,
+  ROUND(avg_yield::numeric, 2) AS avg_yield_kg_per_acre
+FROM crop_season_yields
+WHERE rank = 1
+ORDER BY crop""",
+    ),
+}
+
+
+def _uncovered(spec, years):
+    """Why ``spec.reads`` cannot answer for ``years``; None when they can."""
+    first, last = years
+    for source in spec.reads:
+        view = MATERIALIZED_VIEWS.get(source)
+        if view is not None and 'year' in (view.key or ()):
+            if not view.years[0] <= first <= last <= view.years[1]:
+                return f"{source} only covers {view.years[0]}-{view.years[1]}"
+        elif view is not None or source in PRECOMPUTED_TABLES:
+            fixed = view.years if view is not None else PRECOMPUTED_TABLES[source]
+            if (first, last) != tuple(fixed):
+                return f"{source} is precomputed for {fixed[0]}-{fixed[1]} only"
+    return None
+
+
+def _variant(name, years):
+    """``(template, reads)`` that answer ``name`` for ``years``."""
+    spec = QUERY_SPECS[name]
+    if years is None:
+        return spec.template, spec.reads
+    if spec.years is None:
+        raise ValueError(f"{name} reads every year and takes no window")
+    if years[0] > years[1]:
+        raise ValueError(f"{name}: empty window {years[0]}-{years[1]}")
+    reason = _uncovered(spec, years)
+    if reason is None:
+        return spec.template, spec.reads
+    if spec.window_template is None:
+        raise ValueError(f"{name}: {reason}")
+    return spec.window_template, spec.window_reads
+
+
+def render(name, years=None, **params):
+    """SQL for ``name`` over ``years`` (default: the spec's window).
+
+    ``params`` replace the default placeholders, e.g. ``state='$1'``. Raises
+    ``ValueError`` for a window neither variant of the query can answer.
+    """
+    spec = QUERY_SPECS[name]
+    template, _ = _variant(name, years)
+    first, last = years or spec.years or (None, None)
+    body = template.format(first=int(first) if first is not None else None,
+                           last=int(last) if last is not None else None,
+                           **{**spec.params, **params})
+    return f"/* {spec.title} */{body};"
+
+
+def plan(name, years=None):
+    """Objects that must exist before ``render(name, years)`` runs.
+
+    ``views`` are the materialized views read; ``tables`` are rebuilt by
+    ``publish`` (or, for the fact table, by every load); ``base`` are the
+    loaded tables underneath.
+    """
+    _, reads = _variant(name, years)
+    views = [source for source in reads if source in MATERIALIZED_VIEWS]
+    derived = (*PRECOMPUTED_TABLES, FACT_TABLE)
+    base = {source for source in reads if source not in MATERIALIZED_VIEWS and source not in derived}
+    for view in views:
+        base.update(MATERIALIZED_VIEWS[view].sources)
+    return {
+        'views': views,
+        'tables': [source for source in reads if source in derived],
+        'base': sorted(base),
+    }
+
+
+def export_queries(path):
+    """Write ``{query: SQL}`` for ``server/routes.js``, with node-postgres placeholders."""
+    queries = {name: render(name, **{param: f'${i}' for i, param in enumerate(spec.params, start=1)})
+               for name, spec in QUERY_SPECS.items()}
+    with open(path, 'w') as f:
+        json.dump(queries, f, indent=2)
+        f.write('\n')
+    return queries
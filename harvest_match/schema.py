@@ -0,0 +1,87 @@
+"""Read-time dtypes for the raw CSVs.
+
+Low-cardinality text columns become categoricals and numeric columns get the
+narrowest type that holds them, so ``read_csv`` never materializes the
+object/float64 defaults. Measures stay float64: coordinates because float32
+cannot hold their four decimals exactly, and the pollution, temperature and
+precipitation readings because they are summed into ``state_year_climate``
+and compared with the ``engine.EXTREMES`` thresholds, where float32 rounding
+(0.01 stored as 0.009999999776) can move a value across a cutoff. They cost
+four bytes a row each over float32; the savings come from the categoricals
+and integers.
+"""
+
+import pandas as pd
+
+CROPS_USECOLS = ['Year', 'Period', 'State', 'Commodity', 'Data Item', 'Value']
+
+CROPS_DTYPES = {
+    'Year': 'int16',
+    'Period': 'category',
+    'State': 'category',
+    'Commodity': 'category',
+    'Data Item': 'category',
+    # Kept as text: NASS mixes numbers with codes such as "(D)"
+    'Value': 'string',
+}
+
+POLLUTION_ID_COLUMNS = ['Date', 'Year', 'Month', 'Day', 'State', 'County', 'City']
+
+
+def pollution_usecols(column):
+    return column in POLLUTION_ID_COLUMNS or column.endswith('Mean') or column.endswith('AQI')
+
+
+POLLUTION_DTYPES = {
+    'Date': 'category',
+    'Year': 'int16',
+    'Month': 'int8',
+    'Day': 'int8',
+    'State': 'category',
+    'County': 'category',
+    'City': 'category',
+    **{f'{p} Mean': 'float64' for p in ('O3', 'CO', 'SO2', 'NO2')},
+    # AQI has gaps, so it cannot be a plain integer column
+    **{f'{p} AQI': 'float64' for p in ('O3', 'CO', 'SO2', 'NO2')},
+}
+
+
+def temperature_usecols(column):
+    return not column.startswith('Unnamed') and column != 'monthly_mean_from_1901_to_2000'
+
+
+TEMPERATURE_DTYPES = {
+    'state': 'category',
+    'year': 'int16',
+    'month': 'int8',
+    'average_temp': 'float64',
+}
+
+WEATHER_DTYPES = {
+    'EventId': 'string',
+    'Type': 'category',
+    'Severity': 'category',
+    'Precipitation(in)': 'float64',
+    'TimeZone': 'category',
+    'AirportCode': 'category',
+    'LocationLat': 'float64',
+    'LocationLng': 'float64',
+    'County': 'category',
+    'State': 'category',
+    'StartTime(UTC)': 'string',
+}
+
+
+def frame_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def memory_report(dataset, path, nrows=None):
+    """Compare a plain ``read_csv`` with the typed one for one raw file.
+
+    Returns ``(default_mb, typed_mb)`` for the first ``nrows`` rows.
+    """
+    typed_kwargs = {k: v for k, v in dataset.read_kwargs.items() if k != 'chunksize'}
+    default = pd.read_csv(path, nrows=nrows)
+    typed = pd.read_csv(path, nrows=nrows, **typed_kwargs)
+    return frame_mb(default), frame_mb(typed)
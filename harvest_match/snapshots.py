@@ -0,0 +1,129 @@
+"""Static JSON snapshots of the parameterless endpoints.
+
+Every endpoint in ``SNAPSHOTS`` returns the result of one query rendered by
+``queryspec`` (or, for ``/crop-envelope`` without filters,
+the whole ``crop_envelope`` table) and takes no parameters, so its response is
+fully determined by the loaded data. ``export_snapshots`` runs each query once
+and writes the body exactly as the Express route would send it, plus gzip and
+(when the optional ``brotli`` package is installed) brotli encodings, so the
+server only has to pick one and send it.
+
+A snapshot set goes into its own ``<snapshot_dir>/<version>/`` directory and
+becomes current when ``manifest.json`` is replaced, atomically, to point at it:
+
+    {"version": ..., "generated_at": ...,
+     "snapshots": {"/best-conditions": {"file": "<version>/best-conditions.json",
+                                        "etag": "\\"<sha256 prefix>\\"", "rows": ..., "bytes": ...,
+                                        "encodings": {"gzip": ..., "br": ...}}, ...}}
+
+The ETag hashes the uncompressed body, so it only changes when the data does.
+"""
+
+import datetime
+import decimal
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+from .envelopes import ENVELOPE_TABLE
+from .queryspec import QUERY_SPECS, render
+
+MANIFEST = 'manifest.json'
+# Sets kept besides the current one, for readers still holding the old manifest
+KEEP_PREVIOUS = 1
+
+# Route -> query; each route in server/routes.js runs this SQL when called without parameters
+SNAPSHOTS = {
+    **{spec.route: render(name) for name, spec in QUERY_SPECS.items() if not spec.params},
+    '/crop-envelope': f"SELECT * FROM {ENVELOPE_TABLE} ORDER BY crop",
+}
+
+
+def _json_value(value):
+    # Match node-postgres: NUMERIC arrives as a string, integral doubles print without ".0"
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def query_json(cur, sql):
+    """``(JSON body, row count)`` for ``sql``, serialized like ``res.json(data.rows)``."""
+    cur.execute(sql)
+    columns = [col.name for col in cur.description]
+    rows = [dict(zip(columns, map(_json_value, row))) for row in cur.fetchall()]
+    body = json.dumps(rows, ensure_ascii=False, separators=(',', ':'))
+    return body.encode(), len(rows)
+
+
+def snapshot_name(route):
+    return route.strip('/').replace('/', '_')
+
+
+def compressors():
+    """``{Content-Encoding: compress(bytes)}``; brotli only when it is installed."""
+    encoders = {'gzip': lambda body: gzip.compress(body, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        print("brotli not installed, writing gzip snapshots only")
+    else:
+        encoders['br'] = lambda body: brotli.compress(body, quality=11)
+    return encoders
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _prune(snapshot_dir, current):
+    versions = [entry for entry in os.scandir(snapshot_dir)
+                if entry.is_dir() and entry.name != current]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[KEEP_PREVIOUS:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def export_snapshots(conn, snapshot_dir, version):
+    """Write a snapshot set for ``version`` and make it current; returns the manifest."""
+    version_dir = os.path.join(snapshot_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    encoders = compressors()
+    snapshots = {}
+    with conn.cursor() as cur:
+        for route, sql in SNAPSHOTS.items():
+            body, rows = query_json(cur, sql)
+            name = f'{snapshot_name(route)}.json'
+            _write(os.path.join(version_dir, name), body)
+            encodings = {}
+            for encoding, compress in encoders.items():
+                encoded = f'{name}.{"gz" if encoding == "gzip" else encoding}'
+                _write(os.path.join(version_dir, encoded), compress(body))
+                encodings[encoding] = f'{version}/{encoded}'
+            snapshots[route] = {
+                'file': f'{version}/{name}',
+                'etag': f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+                'rows': rows,
+                'bytes': len(body),
+                'encodings': encodings,
+            }
+            print(f"{route}: {rows} rows, {len(body) / 2**10:.1f} KB")
+    conn.rollback()
+
+    manifest = {
+        'version': version,
+        'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'snapshots': snapshots,
+    }
+    tmp = os.path.join(snapshot_dir, f'.{MANIFEST}.{version}')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(snapshot_dir, MANIFEST))
+    _prune(snapshot_dir, version)
+    return manifest
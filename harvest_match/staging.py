@@ -0,0 +1,168 @@
+"""Parquet staging cache between cleaning and loading.
+
+Cleaned output is written once per source file as a hive-partitioned Parquet
+dataset (``stage_year=2016/stage_state=IOWA/...``) under
+``<cache_dir>/<dataset>/<key>``, where
+the key hashes the source file together with ``STAGE_VERSION``, the table's
+columns, the read options and the source code of the ``clean_*`` function and
+of the ``transforms`` and ``states`` modules it builds on. A later run against
+the same source and the same cleaning code skips parsing and cleaning entirely
+and streams Arrow record batches from the stage into COPY. Requires
+``pyarrow``.
+
+pyarrow refuses to write one batch into more than ``max_partitions``
+directories (1024 by default), fewer than the temperature history's years x
+states, so ``ensure_stage`` first counts both in the raw file's year and state
+columns and raises the limit to their product.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import resource
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from . import states, transforms
+from .bulk_load import TABLES
+from .datasets import extract_transform, read_raw, source_path
+
+PARTITION_COLUMNS = ['stage_year', 'stage_state']
+SUCCESS_MARKER = '_SUCCESS'
+# Bump when cleaned output changes without a change to the hashed code, e.g.
+# after a pandas upgrade
+STAGE_VERSION = 2
+# File descriptors left for everything but the open stage files
+RESERVED_FILES = 64
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def _describe(value):
+    # usecols may be a function; its repr carries an address, its source does not
+    if callable(value):
+        return inspect.getsource(value)
+    return str(value)
+
+
+def stage_key(dataset, digest):
+    """Hash of the source digest and everything that shapes the cleaned rows."""
+    layout = {
+        'version': STAGE_VERSION,
+        'source': digest,
+        'columns': TABLES[dataset.table],
+        'read_kwargs': dataset.read_kwargs,
+        'clean': dataset.clean,
+        'helpers': [inspect.getsource(module) for module in (transforms, states)],
+    }
+    return hashlib.sha256(json.dumps(layout, sort_keys=True, default=_describe).encode()).hexdigest()
+
+
+def stage_path(cache_dir, dataset, key):
+    return os.path.join(cache_dir, dataset.name, key)
+
+
+def is_staged(path):
+    return os.path.exists(os.path.join(path, SUCCESS_MARKER))
+
+
+def _partitioned(dataset, df):
+    period = df[dataset.watermark]
+    if pd.api.types.is_numeric_dtype(period):
+        period = period.astype('int64')
+    else:
+        period = pd.to_datetime(period).dt.year
+    state = 'State' if 'State' in df.columns else 'state'
+    return df.assign(stage_year=period, stage_state=df[state])
+
+
+def partition_limit(dataset, path):
+    """Distinct years times distinct states in the raw file: a bound on the stage's partitions.
+
+    Cleaning only drops rows and maps several raw spellings of a state to one
+    name, so the cleaned stage never has more (year, state) pairs.
+    """
+    years, states = set(), set()
+    for raw in read_raw(dataset, path, usecols=[dataset.raw_watermark, dataset.raw_state]):
+        period = raw[dataset.raw_watermark]
+        if TABLES[dataset.table][dataset.watermark] == 'DATE':
+            period = pd.to_datetime(period, errors='coerce').dt.year
+        else:
+            period = pd.to_numeric(period, errors='coerce')
+        years.update(period.dropna().astype('int64').unique())
+        states.update(raw[dataset.raw_state].dropna().unique())
+    return max(len(years) * len(states), 1)
+
+
+def _widen_dictionaries(schema):
+    # Categorical codes narrow per chunk (int8, int16, ...); fix one index width
+    for i, f in enumerate(schema):
+        if pa.types.is_dictionary(f.type):
+            schema = schema.set(i, f.with_type(pa.dictionary(pa.int32(), f.type.value_type)))
+    return schema
+
+
+def write_stage(dataset, frames, path, max_partitions=1024):
+    """Write cleaned ``frames`` to ``path`` as one partitioned Parquet dataset.
+
+    ``max_partitions`` must cover every (year, state) pair in the frames.
+    """
+    frames = iter(frames)
+    first = _partitioned(dataset, next(frames))
+    schema = _widen_dictionaries(pa.Schema.from_pandas(first, preserve_index=False))
+
+    def batches():
+        yield from pa.Table.from_pandas(first, schema=schema, preserve_index=False).to_batches()
+        for df in frames:
+            table = pa.Table.from_pandas(_partitioned(dataset, df), schema=schema, preserve_index=False)
+            yield from table.to_batches()
+
+    # Beyond the descriptor limit pyarrow closes the least recently used file
+    # and starts another one for that partition later
+    open_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0] - RESERVED_FILES
+    shutil.rmtree(path, ignore_errors=True)
+    ds.write_dataset(
+        batches(), path, schema=schema, format='parquet',
+        partitioning=PARTITION_COLUMNS, partitioning_flavor='hive',
+        max_partitions=max_partitions, max_open_files=max(min(max_partitions, open_limit), 1),
+    )
+    open(os.path.join(path, SUCCESS_MARKER), 'w').close()
+
+
+def read_stage(dataset, path):
+    """Yield the staged table one Arrow record batch (as a DataFrame) at a time."""
+    stage = ds.dataset(path, format='parquet', partitioning='hive')
+    for batch in stage.to_batches(columns=list(TABLES[dataset.table])):
+        yield batch.to_pandas()
+
+
+def staged_rows(path):
+    return ds.dataset(path, format='parquet', partitioning='hive').count_rows()
+
+
+def ensure_stage(dataset, data_dir=None, cache_dir='.stage'):
+    """Return the stage for the current source, building it only if missing."""
+    source = source_path(dataset, data_dir)
+    key = stage_key(dataset, file_digest(source))
+    path = stage_path(cache_dir, dataset, key)
+    if is_staged(path):
+        print(f"{dataset.name}: staging cache hit ({key[:12]})")
+        return path
+
+    write_stage(dataset, extract_transform(dataset, data_dir), path, partition_limit(dataset, source))
+    # Stages for older sources or older cleaning code are no longer reachable
+    for other in os.listdir(os.path.dirname(path)):
+        if other != key:
+            shutil.rmtree(os.path.join(os.path.dirname(path), other), ignore_errors=True)
+    return path
+
+
+def staged_frames(dataset, data_dir=None, cache_dir='.stage'):
+    return read_stage(dataset, ensure_stage(dataset, data_dir, cache_dir))
@@ -0,0 +1,80 @@
+"""The ``states`` dimension.
+
+Every fact table carries a ``state_id SMALLINT`` from this table, so queries
+can join on integers instead of ``UPPER(state)``. Ids are assigned by
+alphabetical order of the upper-case name and never depend on the data.
+"""
+
+from psycopg2.extras import execute_values
+
+from .db import quote_ident
+
+# (name, abbreviation, region); query 6 ranks crops by region
+STATES = [
+    ('ALABAMA', 'AL', 'Southeast'), ('ALASKA', 'AK', 'Pacific'),
+    ('ARIZONA', 'AZ', 'Southwest'), ('ARKANSAS', 'AR', 'Southeast'),
+    ('CALIFORNIA', 'CA', 'West'), ('COLORADO', 'CO', 'West'),
+    ('CONNECTICUT', 'CT', 'Northeast'), ('DELAWARE', 'DE', 'Southeast'),
+    ('DISTRICT OF COLUMBIA', 'DC', 'Southeast'), ('FLORIDA', 'FL', 'Southeast'),
+    ('GEORGIA', 'GA', 'Southeast'), ('HAWAII', 'HI', 'Pacific'),
+    ('IDAHO', 'ID', 'Northwest'), ('ILLINOIS', 'IL', 'Midwest'),
+    ('INDIANA', 'IN', 'Midwest'), ('IOWA', 'IA', 'Midwest'),
+    ('KANSAS', 'KS', 'Midwest'), ('KENTUCKY', 'KY', 'Southeast'),
+    ('LOUISIANA', 'LA', 'Southeast'), ('MAINE', 'ME', 'Northeast'),
+    ('MARYLAND', 'MD', 'Southeast'), ('MASSACHUSETTS', 'MA', 'Northeast'),
+    ('MICHIGAN', 'MI', 'Midwest'), ('MINNESOTA', 'MN', 'Midwest'),
+    ('MISSISSIPPI', 'MS', 'Southeast'), ('MISSOURI', 'MO', 'Midwest'),
+    ('MONTANA', 'MT', 'Northwest'), ('NEBRASKA', 'NE', 'Midwest'),
+    ('NEVADA', 'NV', 'West'), ('NEW HAMPSHIRE', 'NH', 'Northeast'),
+    ('NEW JERSEY', 'NJ', 'Northeast'), ('NEW MEXICO', 'NM', 'Southwest'),
+    ('NEW YORK', 'NY', 'Northeast'), ('NORTH CAROLINA', 'NC', 'Southeast'),
+    ('NORTH DAKOTA', 'ND', 'Midwest'), ('OHIO', 'OH', 'Midwest'),
+    ('OKLAHOMA', 'OK', 'Southwest'), ('OREGON', 'OR', 'Northwest'),
+    ('PENNSYLVANIA', 'PA', 'Northeast'), ('RHODE ISLAND', 'RI', 'Northeast'),
+    ('SOUTH CAROLINA', 'SC', 'Southeast'), ('SOUTH DAKOTA', 'SD', 'Midwest'),
+    ('TENNESSEE', 'TN', 'Southeast'), ('TEXAS', 'TX', 'Southwest'),
+    ('UTAH', 'UT', 'West'), ('VERMONT', 'VT', 'Northeast'),
+    ('VIRGINIA', 'VA', 'Southeast'), ('WASHINGTON', 'WA', 'Northwest'),
+    ('WEST VIRGINIA', 'WV', 'Southeast'), ('WISCONSIN', 'WI', 'Midwest'),
+    ('WYOMING', 'WY', 'Northwest'),
+]
+
+STATE_IDS = {name: i for i, (name, _, _) in enumerate(sorted(STATES), start=1)}
+
+STATES_DDL = """
+CREATE TABLE IF NOT EXISTS states (
+    state_id SMALLINT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    abbreviation CHAR(2) NOT NULL UNIQUE,
+    region TEXT NOT NULL
+);
+"""
+
+
+def state_ids(state):
+    """``state_id`` for a Series of state names in any case; NA when unknown."""
+    return state.astype(str).str.strip().str.upper().map(STATE_IDS).astype('Int16')
+
+
+def load_states(conn):
+    """Create ``states`` if needed and upsert every row; safe to re-run."""
+    rows = [(STATE_IDS[name], name, abbr, region) for name, abbr, region in STATES]
+    with conn.cursor() as cur:
+        cur.execute(STATES_DDL)
+        execute_values(
+            cur,
+            "INSERT INTO states (state_id, name, abbreviation, region) VALUES %s "
+            "ON CONFLICT (state_id) DO UPDATE SET name = EXCLUDED.name, "
+            "abbreviation = EXCLUDED.abbreviation, region = EXCLUDED.region",
+            rows,
+        )
+    conn.commit()
+
+
+def backfill_state_ids(cur, table, state_column):
+    """Fill ``state_id`` on rows loaded before the column existed."""
+    cur.execute(
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS state_id SMALLINT;"
+        f"UPDATE {table} t SET state_id = s.state_id FROM states s "
+        f"WHERE t.state_id IS NULL AND UPPER(t.{quote_ident(state_column)}) = s.name"
+    )
@@ -0,0 +1,321 @@
+"""Deterministic synthetic data shaped like the cleaned tables.
+
+For benchmarks and load tests without the Kaggle/NASS downloads. Every
+generator yields frames with exactly the columns and dtypes the ``clean_*``
+functions produce, in bounded chunks, so they stream straight into
+``bulk_load.load`` at any scale.
+
+Row counts are ``BASE_ROWS * scale`` (1x fits comfortably on a laptop; 10x and
+100x are for scaling tests). ``temperature_data`` is always the full
+state x year x month grid of the real file and does not grow with ``scale``.
+The same ``(scale, seed)`` always produces the same rows.
+
+Distributions follow the real sources closely enough for the queries to
+behave: crop reports concentrate in the Midwest and in harvest months,
+pollution monitors in the populous states, weather event types and
+precipitation depend on the season, and temperatures follow a seasonal cycle
+by region with a slow warming trend. A few (state, year) cells in
+``EXTREME_CELLS`` are drought years under wildfire smoke, extreme on both
+pollution and precipitation by query 4's default thresholds, so its
+leaderboard has crops to rank.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .bulk_load import TABLES
+from .facts import create_fact_table, load_with_facts
+from .states import STATE_IDS, STATES, load_states
+from .transforms import BUSHEL_KG, LB_TO_KG, MONTH_TO_SEASON, SEASON_DTYPE, UNIT_CONVERSIONS
+
+BASE_ROWS = {
+    'crop_data': 25_000,
+    'pollution_data': 100_000,
+    'weather_events': 250_000,
+}
+
+# Rows per generated frame; peak memory is bounded by this, not by the scale
+CHUNK_ROWS = 250_000
+
+NAMES = np.array([name for name, _, _ in STATES])
+ABBRS = np.array([abbr for _, abbr, _ in STATES])
+REGIONS = np.array([region for _, _, region in STATES])
+IDS = np.array([STATE_IDS[name] for name in NAMES])
+TITLE_NAMES = np.array([name.title() for name in NAMES])
+
+# region -> (annual mean °F, seasonal swing °F, centroid lat, centroid lon)
+REGION_CLIMATE = {
+    'Northeast': (48.0, 22.0, 42.5, -73.5),
+    'Southeast': (62.0, 16.0, 34.0, -83.5),
+    'Midwest': (47.0, 26.0, 42.5, -93.0),
+    'Southwest': (62.0, 20.0, 33.5, -102.0),
+    'West': (52.0, 20.0, 38.5, -113.0),
+    'Northwest': (44.0, 20.0, 45.5, -114.0),
+    'Pacific': (50.0, 14.0, 40.0, -152.0),
+}
+
+# Share of rows per region (crops) or per state (pollution monitors)
+CROP_REGION_WEIGHTS = {
+    'Midwest': 5.0, 'Southwest': 2.0, 'Southeast': 2.0, 'Northwest': 2.0,
+    'West': 1.5, 'Northeast': 0.7, 'Pacific': 0.1,
+}
+POLLUTION_STATE_WEIGHTS = {
+    'CALIFORNIA': 10.0, 'TEXAS': 5.0, 'ARIZONA': 4.0, 'PENNSYLVANIA': 3.0,
+    'NEW YORK': 3.0, 'ILLINOIS': 2.0, 'OHIO': 2.0, 'COLORADO': 2.0,
+}
+
+# crop -> (share of reports, typical kg/acre, harvest months)
+CROPS = {
+    'CORN': (0.25, 170 * BUSHEL_KG['CORN'], [8, 9, 10, 11]),
+    'SOYBEANS': (0.20, 50 * BUSHEL_KG['SOYBEANS'], [8, 9, 10, 11]),
+    'WHEAT': (0.20, 48 * BUSHEL_KG['WHEAT'], [5, 6, 7, 8]),
+    'HAY': (0.12, 2.4 * UNIT_CONVERSIONS['TONS / ACRE'], [5, 6, 7, 8]),
+    'OATS': (0.08, 65 * BUSHEL_KG['OATS'], [6, 7, 8]),
+    'SORGHUM': (0.06, 70 * BUSHEL_KG['SORGHUM'], [8, 9, 10, 11]),
+    'BARLEY': (0.05, 72 * BUSHEL_KG['BARLEY'], [6, 7, 8]),
+    'COTTON': (0.04, 850 * LB_TO_KG, [8, 9, 10, 11, 12]),
+}
+
+# season -> {event type: probability}
+WEATHER_TYPES = {
+    'Winter': {'Snow': 0.45, 'Rain': 0.25, 'Cold': 0.15, 'Fog': 0.10, 'Storm': 0.05},
+    'Spring': {'Rain': 0.55, 'Storm': 0.15, 'Fog': 0.15, 'Snow': 0.10, 'Cold': 0.05},
+    'Summer': {'Rain': 0.65, 'Storm': 0.30, 'Fog': 0.05},
+    'Fall': {'Rain': 0.55, 'Fog': 0.20, 'Storm': 0.10, 'Snow': 0.10, 'Cold': 0.05},
+}
+SEVERITIES = {'Light': 0.55, 'Moderate': 0.30, 'Heavy': 0.12, 'Severe': 0.03}
+# More events are reported in winter than in the rest of the year
+WEATHER_MONTH_WEIGHTS = np.array([1.3, 1.2, 1.0, 1.0, 1.0, 0.9, 0.9, 0.9, 0.9, 1.0, 1.1, 1.3])
+
+DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+MONTH_ABBRS = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                        'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+SEASONS = np.array([MONTH_TO_SEASON[m] for m in range(1, 13)])
+
+CROP_YEARS = (1990, 2023)
+POLLUTION_YEARS = (2000, 2021)
+TEMPERATURE_YEARS = (1950, 2022)
+WEATHER_YEARS = (2016, 2022)
+# The temperature file covers the contiguous states only
+TEMPERATURE_STATES = np.flatnonzero(~np.isin(ABBRS, ['AK', 'HI', 'DC']))
+
+# (state, year) drought years under wildfire smoke, inside both the pollution
+# and the weather years: pollution means scaled up, precipitation down
+EXTREME_CELLS = [('CALIFORNIA', 2020), ('ARIZONA', 2020), ('TEXAS', 2018),
+                 ('KANSAS', 2018), ('NEBRASKA', 2021), ('IOWA', 2021)]
+SMOKE_FACTOR = 1.8
+DROUGHT_FACTOR = 0.05
+
+
+def _climate(column):
+    return np.array([REGION_CLIMATE[r][column] for r in REGIONS])
+
+
+# Spread states around their region's centroid, deterministically by position
+_JITTER = (np.arange(len(STATES)) * 7 % 9 - 4) * 0.6
+STATE_LAT = _climate(2) + _JITTER
+STATE_LON = _climate(3) - _JITTER * 1.5
+STATE_MEAN_TEMP = _climate(0) - 1.2 * _JITTER
+STATE_SWING = _climate(1)
+
+
+def _normalized(weights):
+    weights = np.asarray(weights, dtype='float64')
+    return weights / weights.sum()
+
+
+def _rng(seed, table, chunk):
+    return np.random.default_rng([seed, list(TABLES).index(table), chunk])
+
+
+def _chunks(table, scale):
+    total = BASE_ROWS[table] * scale
+    for chunk, start in enumerate(range(0, total, CHUNK_ROWS)):
+        yield chunk, start, min(CHUNK_ROWS, total - start)
+
+
+def _years(rng, bounds, n, growth=0.0):
+    years = np.arange(bounds[0], bounds[1] + 1)
+    # growth > 0 makes later years more common (more reports/monitors over time)
+    return rng.choice(years, n, p=_normalized((1 + growth) ** (years - years[0])))
+
+
+def _days(rng, month):
+    return 1 + (rng.random(len(month)) * DAYS_IN_MONTH[month - 1]).astype('int64')
+
+
+def _states(codes, names):
+    return pd.Categorical.from_codes(codes, categories=names)
+
+
+def _state_ids(codes):
+    return pd.array(IDS[codes], dtype='Int16')
+
+
+def _seasons(month):
+    return pd.Categorical(SEASONS[month - 1], dtype=SEASON_DTYPE)
+
+
+def _in_extreme_cell(codes, year):
+    cells = [np.flatnonzero(NAMES == name)[0] * 10_000 + y for name, y in EXTREME_CELLS]
+    return np.isin(codes * 10_000 + year, cells)
+
+
+def _local_names(kind, codes, rng, per_state):
+    k = rng.integers(0, per_state, len(codes))
+    return pd.Series(np.char.add(np.char.add(ABBRS[codes], f' {kind} '), k.astype(str)), dtype='category')
+
+
+def _airports(codes, rng):
+    k = rng.integers(0, 6, len(codes))
+    return pd.Series(np.char.add(np.char.add('K', ABBRS[codes]), k.astype(str)), dtype='category')
+
+
+def crop_frames(scale=1, seed=0):
+    names = list(CROPS)
+    share = _normalized([CROPS[c][0] for c in names])
+    typical = np.array([CROPS[c][1] for c in names])
+    state_p = _normalized([0.0 if a == 'DC' else CROP_REGION_WEIGHTS[r] for a, r in zip(ABBRS, REGIONS)])
+    for chunk, _, n in _chunks('crop_data', scale):
+        rng = _rng(seed, 'crop_data', chunk)
+        crop = rng.choice(len(names), n, p=share)
+        state = rng.choice(len(NAMES), n, p=state_p)
+        year = _years(rng, CROP_YEARS, n, growth=0.03)
+        month = np.empty(n, dtype='int64')
+        for i, c in enumerate(names):
+            rows = crop == i
+            month[rows] = rng.choice(CROPS[c][2], rows.sum())
+        # ~1%/year yield trend, Midwest above the national typical value
+        trend = 1 + 0.01 * (year - CROP_YEARS[0]) - 0.15
+        region = np.where(REGIONS[state] == 'Midwest', 1.1, 0.9)
+        kg = typical[crop] * trend * region * rng.lognormal(0, 0.15, n)
+        yield pd.DataFrame({
+            'year': year.astype('int16'),
+            'state': _states(state, NAMES),
+            'crop': pd.Categorical.from_codes(crop, categories=names),
+            'month': MONTH_ABBRS[month - 1],
+            'yield_kg_per_acre': kg.round(2),
+            'state_id': _state_ids(state),
+            'season': _seasons(month),
+        })
+
+
+def pollution_frames(scale=1, seed=0):
+    state_p = _normalized([POLLUTION_STATE_WEIGHTS.get(name, 1.0) for name in NAMES])
+    for chunk, _, n in _chunks('pollution_data', scale):
+        rng = _rng(seed, 'pollution_data', chunk)
+        state = rng.choice(len(NAMES), n, p=state_p)
+        year = _years(rng, POLLUTION_YEARS, n, growth=0.02)
+        month = rng.integers(1, 13, n)
+        day = _days(rng, month)
+        since = year - POLLUTION_YEARS[0]
+        # Ozone peaks in summer, combustion gases in winter; all but O3 trend down
+        summer = np.sin((month - 4) / 12 * 2 * np.pi)
+        o3 = rng.gamma(8, 0.0038, n) * (1 + 0.3 * summer)
+        co = rng.gamma(3, 0.12, n) * (1 - 0.2 * summer) * 0.96 ** since
+        so2 = rng.gamma(2, 1.2, n) * 0.93 ** since
+        no2 = rng.gamma(4, 4.0, n) * (1 - 0.15 * summer) * 0.97 ** since
+        smoke = np.where(_in_extreme_cell(state, year), SMOKE_FACTOR, 1.0)
+        dates = pd.to_datetime({'year': year, 'month': month, 'day': day})
+        df = pd.DataFrame({
+            'Date': dates.dt.strftime('%Y-%m-%d').astype('category'),
+            'Year': year.astype('int16'),
+            'Month': month.astype('int8'),
+            'Day': day.astype('int8'),
+            'State': _states(state, TITLE_NAMES),
+            'County': _local_names('County', state, rng, 8),
+            'City': _local_names('City', state, rng, 12),
+        })
+        for name, mean, aqi_per_unit in [('O3', o3, 1000.0), ('CO', co, 11.0),
+                                         ('SO2', so2, 1.5), ('NO2', no2, 1.7)]:
+            mean = mean * smoke
+            df[f'{name} Mean'] = mean
+            aqi = mean * aqi_per_unit * rng.normal(1, 0.1, n)
+            df[f'{name} AQI'] = np.clip(aqi.round(), 0, 500)
+        df['Season'] = _seasons(month)
+        df['state_id'] = _state_ids(state)
+        yield df
+
+
+def temperature_frames(scale=1, seed=0):
+    """The full state x year x month grid; ``scale`` does not change its size."""
+    rng = _rng(seed, 'temperature_data', 0)
+    years = np.arange(TEMPERATURE_YEARS[0], TEMPERATURE_YEARS[1] + 1)
+    state, year, month = (a.ravel() for a in np.meshgrid(TEMPERATURE_STATES, years, np.arange(1, 13),
+                                                          indexing='ij'))
+    cycle = np.sin((month - 4) / 12 * 2 * np.pi)
+    temp = (STATE_MEAN_TEMP[state] + STATE_SWING[state] * cycle
+            + 0.02 * (year - TEMPERATURE_YEARS[0]) + rng.normal(0, 2.5, len(state)))
+    yield pd.DataFrame({
+        'state': _states(state, TITLE_NAMES),
+        'year': year.astype('int16'),
+        'month': month.astype('int8'),
+        'average_temp': temp.round(1),
+        'centroid_lon': STATE_LON[state].round(4),
+        'centroid_lat': STATE_LAT[state].round(4),
+        'state_id': _state_ids(state),
+        'season': _seasons(month),
+    })
+
+
+def weather_frames(scale=1, seed=0):
+    state_p = _normalized([0.1 if a == 'DC' else 0.3 if r == 'Pacific' else 1.0
+                           for a, r in zip(ABBRS, REGIONS)])
+    month_p = _normalized(WEATHER_MONTH_WEIGHTS)
+    severities = list(SEVERITIES)
+    severity_p = _normalized(list(SEVERITIES.values()))
+    for chunk, start, n in _chunks('weather_events', scale):
+        rng = _rng(seed, 'weather_events', chunk)
+        state = rng.choice(len(NAMES), n, p=state_p)
+        year = _years(rng, WEATHER_YEARS, n)
+        month = 1 + rng.choice(12, n, p=month_p)
+        day = _days(rng, month)
+        season = SEASONS[month - 1]
+        kind = np.empty(n, dtype=object)
+        for name, types in WEATHER_TYPES.items():
+            rows = season == name
+            kind[rows] = rng.choice(list(types), rows.sum(), p=_normalized(list(types.values())))
+        severity = rng.choice(len(severities), n, p=severity_p)
+        wet = np.isin(kind, ['Rain', 'Snow', 'Storm'])
+        precipitation = np.where(wet, rng.gamma(1.5, 0.06, n) * (1 + severity), 0.0)
+        precipitation = (precipitation * np.where(_in_extreme_cell(state, year), DROUGHT_FACTOR, 1.0)).round(2)
+        lon = STATE_LON[state] + rng.normal(0, 1.5, n)
+        timezone = np.select(
+            [lon < -140, lon < -114, lon < -102, lon < -87],
+            ['US/Alaska', 'US/Pacific', 'US/Mountain', 'US/Central'], 'US/Eastern')
+        yield pd.DataFrame({
+            'event_id': np.char.add('W-', np.arange(start, start + n).astype(str)),
+            'type': pd.Categorical(kind),
+            'severity': pd.Categorical.from_codes(severity, categories=severities),
+            'precipitation': precipitation,
+            'timezone': pd.Categorical(timezone),
+            'airport_code': _airports(state, rng),
+            'location_lat': (STATE_LAT[state] + rng.normal(0, 1.0, n)).round(4),
+            'location_lng': lon.round(4),
+            'county': _local_names('County', state, rng, 20),
+            'state': _states(state, TITLE_NAMES),
+            'state_id': _state_ids(state),
+            'start_date': pd.to_datetime({'year': year, 'month': month, 'day': day}).dt.date,
+            'season': _seasons(month),
+        })
+
+
+GENERATORS = {
+    'crop_data': crop_frames,
+    'pollution_data': pollution_frames,
+    'temperature_data': temperature_frames,
+    'weather_events': weather_frames,
+}
+
+
+def synthetic_frames(table, scale=1, seed=0):
+    """Yield synthetic frames for ``table``; a drop-in for ``extract_transform``."""
+    return GENERATORS[table](scale, seed)
+
+
+def load_synthetic(conn, tables=None, scale=1, seed=0, fmt='csv'):
+    """Recreate ``tables`` (default: all four) from synthetic data, facts included."""
+    load_states(conn)
+    create_fact_table(conn)
+    return {table: load_with_facts(conn, table, synthetic_frames(table, scale, seed), fmt)
+            for table in tables or GENERATORS}
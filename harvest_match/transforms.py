@@ -0,0 +1,99 @@
+"""Pure DataFrame transforms shared by the dataset cleaners.
+
+Nothing in here touches the network, the filesystem or the database, so the
+functions can be profiled on their own and shipped to worker processes.
+"""
+
+import pandas as pd
+
+STATE_ABBR_TO_NAME = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas',
+    'CA': 'California', 'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho',
+    'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas',
+    'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi',
+    'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma',
+    'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina',
+    'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah',
+    'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia',
+    'WI': 'Wisconsin', 'WY': 'Wyoming'
+}
+
+MONTH_TO_SEASON = {
+    12: 'Winter', 1: 'Winter', 2: 'Winter',
+    3: 'Spring', 4: 'Spring', 5: 'Spring',
+    6: 'Summer', 7: 'Summer', 8: 'Summer',
+    9: 'Fall', 10: 'Fall', 11: 'Fall'
+}
+
+MONTH_ABBR_TO_SEASON = {
+    'Dec': 'Winter', 'Jan': 'Winter', 'Feb': 'Winter',
+    'Mar': 'Spring', 'Apr': 'Spring', 'May': 'Spring',
+    'Jun': 'Summer', 'Jul': 'Summer', 'Aug': 'Summer',
+    'Sep': 'Fall',   'Oct': 'Fall',   'Nov': 'Fall'
+}
+
+SEASON_DTYPE = pd.CategoricalDtype(['Winter', 'Spring', 'Summer', 'Fall'])
+
+LB_TO_KG = 0.45359237
+
+# Normalize units to kilograms per acre
+UNIT_CONVERSIONS = {
+    'TONS / ACRE': 907.185,  # 1 ton (US) = 907.185 kg
+    'BU / ACRE': 27.216,     # 60 lb bushel, only used for crops missing below
+    'LB / ACRE': 0.453592    # 1 pound = 0.453592 kg
+}
+
+# USDA standard bushel weights in pounds
+BUSHEL_WEIGHTS_LB = {
+    'BARLEY': 48,
+    'CORN': 56,
+    'FLAXSEED': 56,
+    'OATS': 32,
+    'RYE': 56,
+    'SORGHUM': 56,
+    'SOYBEANS': 60,
+    'WHEAT': 60,
+}
+
+BUSHEL_KG = {crop: lb * LB_TO_KG for crop, lb in BUSHEL_WEIGHTS_LB.items()}
+
+
+def normalize_state(state):
+    """Map raw state codes such as ``'CO'`` or ``'CO '`` to full state names."""
+    abbr = state.astype(str).str.strip().str.extract(r'^([A-Z]{2})')[0]
+    return abbr.map(STATE_ABBR_TO_NAME).astype('category')
+
+
+def season_from_month(month):
+    """Season for a Series of month numbers (1-12)."""
+    return month.map(MONTH_TO_SEASON).astype(SEASON_DTYPE)
+
+
+def season_from_month_abbr(month):
+    """Season for a Series of title-case month abbreviations (``'Jan'``)."""
+    return month.map(MONTH_ABBR_TO_SEASON).astype(SEASON_DTYPE)
+
+
+def conversion_factors(unit, crop):
+    """Return the kg multiplier for every row, NaN where the unit is unknown."""
+    factors = unit.map(UNIT_CONVERSIONS)
+    is_bushel = unit.eq('BU / ACRE')
+    factors[is_bushel] = (
+        crop[is_bushel].map(BUSHEL_KG).astype('float64').fillna(UNIT_CONVERSIONS['BU / ACRE'])
+    )
+    return factors
+
+
+def yield_kg_per_acre(value, unit, crop):
+    """Vectorized ``value * factor``; rows with an unknown unit come back NaN."""
+    value = pd.to_numeric(value, errors='coerce').astype('float64')
+    return value * conversion_factors(unit, crop)
+
+
+def select_columns(df, columns):
+    """Keep and rename columns using an ordered ``{raw: clean}`` mapping."""
+    return df[list(columns)].rename(columns=columns)
@@ -0,0 +1,130 @@
+"""Materialized views read by ``queries/optimized_queries.py``.
+
+Each view is declared once here with its defining query, the base tables it
+reads and the inclusive year window it covers. ``migrations`` creates them;
+a load only refreshes views whose inputs changed inside that window.
+
+Every view reads base tables only, never another view, so refreshes need no
+ordering and run side by side on their own connections. Views with a ``key``
+get a unique index on it and are refreshed ``CONCURRENTLY``, so queries keep
+reading the old rows meanwhile; the rest take a short exclusive lock.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class View:
+    # Base tables read; a view never reads another view
+    sources: tuple
+    years: tuple
+    query: str
+    # Columns unique per row, required for REFRESH ... CONCURRENTLY
+    key: tuple = None
+
+
+MATERIALIZED_VIEWS = {
+    'weather_avg_mv': View(('weather_events',), (2016, 2022), key=('state_id',), query="""
+SELECT
+  state_id,
+  AVG(precipitation) AS avg_precipitation
+FROM weather_events
+WHERE start_date BETWEEN '2016-01-01' AND '2022-12-31' AND state_id IS NOT NULL
+GROUP BY state_id
+"""),
+    # Keeps the name for display; readers join on state_id
+    'crop_yearly_mv': View(('crop_data',), (2016, 2021), key=('year', 'state'), query="""
+SELECT
+  year,
+  UPPER(state) AS state,
+  state_id,
+  ROUND(AVG(yield_kg_per_acre)::numeric, 2) AS avg_yield
+FROM crop_data
+WHERE year BETWEEN 2016 AND 2021
+GROUP BY year, UPPER(state), state_id
+"""),
+}
+
+# Views no query reads any more; dropped by ``migrations``
+RETIRED_VIEWS = (
+    'pollution_yearly_mv', 'pollution_avg_by_year_state_mv',
+    'precip_yearly_mv', 'precip_avg_by_year_state_mv',
+    'temperature_yearly_mv', 'temperature_avg_by_year_state_mv',
+    'state_avg_precip_mv',
+    # Query 3's crop-row tercile labels; ``conditions.best_conditions`` replaces them
+    'pollution_label_mv', 'temp_label_mv', 'precip_label_mv',
+    # Per-(year, state) climate; queries 2-5 read ``facts.state_year_climate`` instead
+    'pollution_by_year_state_mv', 'temperature_by_year_state_mv', 'precip_by_year_state_mv',
+)
+
+
+def key_index(name):
+    return f"{name}_key"
+
+
+def key_index_sql(name):
+    columns = ', '.join(MATERIALIZED_VIEWS[name].key)
+    return f"CREATE UNIQUE INDEX IF NOT EXISTS {key_index(name)} ON {name} ({columns})"
+
+
+def affected_views(changes):
+    """Views touched by ``changes``, a ``{table: first changed year}`` mapping.
+
+    A year of ``None`` means the whole table was replaced.
+    """
+    affected = []
+    for name, view in MATERIALIZED_VIEWS.items():
+        last = view.years[1]
+        for table in view.sources:
+            if table in changes and (changes[table] is None or changes[table] <= last):
+                affected.append(name)
+                break
+    return affected
+
+
+def existing_views(cur):
+    """``{name: populated}`` for the materialized views in the current schema."""
+    cur.execute("SELECT matviewname, ispopulated FROM pg_matviews WHERE schemaname = current_schema()")
+    return dict(cur.fetchall())
+
+
+def refresh_sql(name, concurrently):
+    return f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{name}"
+
+
+def _refresh(name, concurrently):
+    from .db import connect
+
+    start = time.perf_counter()
+    conn = connect()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(refresh_sql(name, concurrently))
+    finally:
+        conn.close()
+    return time.perf_counter() - start
+
+
+def refresh_views(conn, names, workers=4):
+    """Refresh each of ``names`` that exists, on up to ``workers`` connections at once.
+
+    ``CONCURRENTLY`` is used when the view has its unique key index and has
+    been populated. Returns the names refreshed, in order.
+    """
+    with conn.cursor() as cur:
+        present = existing_views(cur)
+        cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")
+        indexes = {row[0] for row in cur.fetchall()}
+    conn.commit()
+
+    names = [name for name in names if name in present]
+    concurrent = {name: present[name] and key_index(name) in indexes for name in names}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        seconds = pool.map(lambda name: _refresh(name, concurrent[name]), names)
+        for name, elapsed in zip(names, seconds):
+            mode = 'concurrently' if concurrent[name] else 'locked'
+            print(f"{name}: refreshed {mode} in {elapsed:.1f}s")
+    return names
@@ -0,0 +1,117 @@
+const { Client } = require('pg');
+
+// Must match DATA_VERSION_CHANNEL in harvest_match/publish.py
+const DATA_VERSION_CHANNEL = 'harvest_match_data_version';
+const RECONNECT_MS = 5000;
+
+/**
+ * In-process LRU cache of JSON response bodies with a per-entry TTL.
+ * A Map keeps insertion order, so re-inserting on every hit makes the
+ * first key the least recently used one.
+ */
+class ResponseCache {
+  constructor({ maxEntries = 500, ttlMs = 60 * 60 * 1000 } = {}) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.entries = new Map();
+    this.version = null;
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    this.entries.delete(key);
+    if (entry.expires < Date.now()) {
+      return undefined;
+    }
+    this.entries.set(key, entry);
+    return entry.body;
+  }
+
+  set(key, body) {
+    this.entries.delete(key);
+    this.entries.set(key, { body, expires: Date.now() + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+    }
+  }
+
+  clear(version = null) {
+    this.entries.clear();
+    this.version = version;
+  }
+
+  // Express middleware: serve GETs from the cache, keyed by route and parameters
+  middleware() {
+    return (req, res, next) => {
+      if (req.method !== 'GET') {
+        return next();
+      }
+      const key = req.originalUrl;
+      const body = this.get(key);
+      if (body !== undefined) {
+        res.set('X-Cache', 'HIT');
+        return res.json(body);
+      }
+      res.set('X-Cache', 'MISS');
+      // A response computed before a new data version arrived must not be cached under it
+      const version = this.version;
+      const json = res.json.bind(res);
+      res.json = (data) => {
+        // Routes set res.locals.skipCache when they answer with an error fallback
+        if (res.statusCode === 200 && !res.locals.skipCache && this.version === version) {
+          this.set(key, data);
+        }
+        return json(data);
+      };
+      next();
+    };
+  }
+}
+
+/**
+ * Clear the cache whenever the Python loader publishes a new data version.
+ * The listener connection is re-opened if it drops; since notifications may
+ * have been missed meanwhile, the cache is cleared on every (re)connect.
+ */
+const watchDataVersion = function(cache, connectionConfig) {
+  const listen = async () => {
+    const client = new Client(connectionConfig);
+    let closed = false;
+    const retry = (err) => {
+      if (closed) {
+        return;
+      }
+      closed = true;
+      console.log(err);
+      client.removeAllListeners();
+      client.end().catch(() => {});
+      setTimeout(listen, RECONNECT_MS);
+    };
+    client.on('error', retry);
+    client.on('notification', (msg) => {
+      if (msg.channel === DATA_VERSION_CHANNEL) {
+        cache.clear(msg.payload);
+      }
+    });
+    try {
+      await client.connect();
+      await client.query(`LISTEN ${DATA_VERSION_CHANNEL}`);
+      const current = await client.query(`SELECT to_regclass('data_version') IS NOT NULL AS present`);
+      const version = current.rows[0].present
+        ? (await client.query('SELECT token FROM data_version')).rows[0]?.token
+        : null;
+      cache.clear(version ?? null);
+    } catch (err) {
+      retry(err);
+    }
+  };
+  listen();
+};
+
+module.exports = {
+  ResponseCache,
+  watchDataVersion,
+};
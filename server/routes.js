@@ -1,5 +1,7 @@
 const { Pool, types } = require('pg');
 const config = require('./config.json')
+// Rendered from harvest_match/queryspec.py: python -m harvest_match --export-queries server/queries.json
+const queries = require('./queries.json');
 
 // Override the default parsing for BIGINT (PostgreSQL type ID 20)
 types.setTypeParser(20, val => parseInt(val, 10)); //DO NOT DELETE THIS
@@ -40,64 +42,11 @@ const mapPage = function(req, res) {
 const getStateAverages = async function (req, res) {
   const state = req.params.state.toUpperCase();
 
-  connection.query(`
-    WITH pollution_avg AS (
-        SELECT
-          UPPER("State") AS state,
-          AVG("CO Mean") AS avg_co,
-          AVG("NO2 Mean") AS avg_no2,
-          AVG("SO2 Mean") AS avg_so2,
-          AVG("O3 Mean") AS avg_o3
-        FROM pollution_data
-        WHERE "Year" BETWEEN 2016 AND 2022
-        GROUP BY UPPER("State")
-      ),
-      temperature_avg AS (
-        SELECT
-          UPPER(state) AS state,
-          AVG(average_temp) AS avg_temp
-        FROM temperature_data
-        WHERE year BETWEEN 2016 AND 2022
-        GROUP BY UPPER(state)
-      ),
-      crop_yield_ranked AS (
-        SELECT
-          UPPER(state) AS state,
-          crop,
-          AVG(yield_kg_per_acre) AS avg_yield,
-          ROW_NUMBER() OVER (
-            PARTITION BY UPPER(state)
-            ORDER BY AVG(yield_kg_per_acre) DESC
-          ) AS rank
-        FROM crop_data
-        WHERE year BETWEEN 2016 AND 2022
-        GROUP BY UPPER(state), crop
-      ),
-      crop_summary AS (
-        SELECT
-          state,
-          crop AS dominant_crop
-        FROM crop_yield_ranked
-        WHERE rank = 1
-      )
-
-      SELECT
-        p.state,
-        ROUND(p.avg_co::numeric, 4) AS avg_co,
-        ROUND(p.avg_no2::numeric, 4) AS avg_no2,
-        ROUND(p.avg_so2::numeric, 4) AS avg_so2,
-        ROUND(p.avg_o3::numeric, 4) AS avg_o3,
-        ROUND(w.avg_precipitation::numeric, 2) AS avg_precipitation,
-        ROUND(t.avg_temp::numeric, 2) AS avg_temp,
-        c.dominant_crop
-      FROM pollution_avg p
-      LEFT JOIN weather_avg_mv w ON p.state = w.state
-      LEFT JOIN temperature_avg t ON p.state = t.state
-      LEFT JOIN crop_summary c ON p.state = c.state
-      WHERE p.state = $1;
-  `, [state], (err, data) => {
+  // state_profile is rebuilt by the Python loader, keyed by upper-case state
+  connection.query(queries.query1, [state], (err, data) => {
     if (err) {
       console.log(err);
+      res.locals.skipCache = true;
       res.json([]);
     } else {
       res.json(data.rows);
@@ -106,40 +55,11 @@ const getStateAverages = async function (req, res) {
 };
 
 const bestRegionForCrop = async function(req, res) {
-  connection.query(`
-    WITH state_regions AS (
-      SELECT * FROM (VALUES
-        ('MAINE','Northeast'), ('NEW HAMPSHIRE','Northeast'), ('VERMONT','Northeast'), ('MASSACHUSETTS','Northeast'), ('RHODE ISLAND','Northeast'), ('CONNECTICUT','Northeast'),
-        ('NEW YORK','Northeast'), ('PENNSYLVANIA','Northeast'), ('NEW JERSEY','Northeast'),
-        ('DELAWARE','Southeast'), ('MARYLAND','Southeast'), ('DISTRICT OF COLUMBIA','Southeast'), ('VIRGINIA','Southeast'), ('WEST VIRGINIA','Southeast'), ('NORTH CAROLINA','Southeast'),
-        ('SOUTH CAROLINA','Southeast'), ('GEORGIA','Southeast'), ('FLORIDA','Southeast'), ('KENTUCKY','Southeast'), ('TENNESSEE','Southeast'), ('MISSISSIPPI','Southeast'),
-        ('ALABAMA','Southeast'), ('ARKANSAS','Southeast'), ('LOUISIANA','Southeast'),
-        ('OHIO','Midwest'), ('MICHIGAN','Midwest'), ('INDIANA','Midwest'), ('ILLINOIS','Midwest'), ('WISCONSIN','Midwest'),
-        ('MINNESOTA','Midwest'), ('IOWA','Midwest'), ('MISSOURI','Midwest'), ('NORTH DAKOTA','Midwest'), ('SOUTH DAKOTA','Midwest'), ('NEBRASKA','Midwest'), ('KANSAS','Midwest'),
-        ('TEXAS','Southwest'), ('OKLAHOMA','Southwest'), ('NEW MEXICO','Southwest'), ('ARIZONA','Southwest'),
-        ('COLORADO','West'), ('UTAH','West'), ('NEVADA','West'), ('CALIFORNIA','West'),
-        ('MONTANA','Northwest'), ('IDAHO','Northwest'), ('OREGON','Northwest'), ('WASHINGTON','Northwest'), ('WYOMING','Northwest'),
-        ('ALASKA','Pacific'), ('HAWAII','Pacific')
-      ) AS t(state, region)
-    ),
-    regional_yields AS (
-      SELECT sr.region, c.crop, AVG(c.yield_kg_per_acre) AS avg_yield
-      FROM crop_data c
-      JOIN state_regions sr ON UPPER(c.state) = sr.state
-      GROUP BY sr.region, c.crop
-    ),
-    ranked AS (
-      SELECT crop, region, avg_yield,
-             ROW_NUMBER() OVER (PARTITION BY crop ORDER BY avg_yield DESC) AS rank
-      FROM regional_yields
-    )
-    SELECT crop, region AS best_region, ROUND(avg_yield::numeric, 2) AS avg_yield
-    FROM ranked
-    WHERE rank = 1
-    ORDER BY crop;`,
+  connection.query(queries.query6,
     (err, data) => {
       if (err) {
         console.log(err);
+        res.locals.skipCache = true;
         res.json([]);
       } else {
         res.json(data.rows);
@@ -148,37 +68,11 @@ const bestRegionForCrop = async function(req, res) {
 };
 
 const bestPollutionRange = async function(req, res) {
-  connection.query(`
-    WITH state_pollution_index AS (
-      SELECT
-        UPPER("State") AS state,
-        AVG("CO Mean") + AVG("NO2 Mean") + AVG("SO2 Mean") + AVG("O3 Mean") AS pollution_index
-      FROM pollution_data
-      WHERE "Year" BETWEEN 2016 AND 2022
-      GROUP BY UPPER("State")
-    ),
-    crop_states AS (
-      SELECT DISTINCT UPPER(state) AS state, crop
-      FROM crop_data
-      WHERE year BETWEEN 2016 AND 2022
-    ),
-    crop_pollution_joined AS (
-      SELECT
-        cs.crop,
-        spi.pollution_index
-      FROM crop_states cs
-      JOIN state_pollution_index spi ON cs.state = spi.state
-    )
-    SELECT
-      crop,
-      ROUND(MIN(pollution_index)::numeric, 2) AS min_pollution_index,
-      ROUND(MAX(pollution_index)::numeric, 2) AS max_pollution_index
-    FROM crop_pollution_joined
-    GROUP BY crop
-    ORDER BY crop;`,
+  connection.query(queries.query5,
     (err, data) => {
       if (err) {
         console.log(err);
+        res.locals.skipCache = true;
         res.json([]);
       } else {
         res.json(data.rows);
@@ -187,22 +81,11 @@ const bestPollutionRange = async function(req, res) {
 };
 
 const bestPrecipitationRange = async function(req, res) {
-  connection.query(`
-    SELECT
-        c.crop,
-        ROUND(MIN(p.avg_precip)::numeric, 2) AS min_precip_mm,
-        ROUND(MAX(p.avg_precip)::numeric, 2) AS max_precip_mm
-      FROM (
-        SELECT DISTINCT UPPER(state) AS state, crop
-        FROM crop_data
-        WHERE year BETWEEN 2016 AND 2022
-      ) c
-      JOIN state_avg_precip_mv p ON c.state = p.state
-      GROUP BY c.crop
-      ORDER BY c.crop;`,
+  connection.query(queries.query7,
     (err, data) => {
       if (err) {
         console.log(err);
+        res.locals.skipCache = true;
         res.json([]);
       } else {
         res.json(data.rows);
@@ -211,45 +94,11 @@ const bestPrecipitationRange = async function(req, res) {
 };
 
 const bestTemperatureRange = async function(req, res) {
-  connection.query(`
-    WITH yearly_state_temp AS (
-      SELECT
-        year,
-        UPPER(state) AS state,
-        AVG(average_temp) AS yearly_avg_temp
-      FROM temperature_data
-      WHERE year BETWEEN 2016 AND 2022
-      GROUP BY year, UPPER(state)
-    ),
-    state_avg_temp AS (
-      SELECT
-        state,
-        AVG(yearly_avg_temp) AS avg_temp_f
-      FROM yearly_state_temp
-      GROUP BY state
-    ),
-    crop_states AS (
-      SELECT DISTINCT UPPER(state) AS state, crop
-      FROM crop_data
-      WHERE year BETWEEN 2016 AND 2022
-    ),
-    crop_temp_joined AS (
-      SELECT
-        cs.crop,
-        sat.avg_temp_f
-      FROM crop_states cs
-      JOIN state_avg_temp sat ON cs.state = sat.state
-    )
-    SELECT
-      crop,
-      ROUND(MIN(avg_temp_f)::numeric, 1) AS min_temp_f,
-      ROUND(MAX(avg_temp_f)::numeric, 1) AS max_temp_f
-    FROM crop_temp_joined
-    GROUP BY crop
-    ORDER BY crop;`,
+  connection.query(queries.query8,
     (err, data) => {
       if (err) {
         console.log(err);
+        res.locals.skipCache = true;
         res.json([]);
       } else {
         res.json(data.rows);
@@ -258,47 +107,10 @@ const bestTemperatureRange = async function(req, res) {
 };
 
 const bestConditionsByCrop = async function(req, res) {
-  const query = `
-    WITH crop_pollution_best AS (
-        SELECT
-          crop,
-          pollution_group AS best_pollution,
-          ROW_NUMBER() OVER (PARTITION BY crop ORDER BY AVG(yield_kg_per_acre) DESC) AS rank
-        FROM pollution_label_mv
-        GROUP BY crop, pollution_group
-      ),
-      crop_temp_best AS (
-        SELECT
-          crop,
-          temp_group AS best_temp,
-          ROW_NUMBER() OVER (PARTITION BY crop ORDER BY AVG(yield_kg_per_acre) DESC) AS rank
-        FROM temp_label_mv
-        GROUP BY crop, temp_group
-      ),
-      crop_precip_best AS (
-        SELECT
-          crop,
-          precip_group AS best_precip,
-          ROW_NUMBER() OVER (PARTITION BY crop ORDER BY AVG(yield_kg_per_acre) DESC) AS rank
-        FROM precip_label_mv
-        GROUP BY crop, precip_group
-      )
-
-      SELECT
-        p.crop,
-        p.best_pollution,
-        t.best_temp,
-        r.best_precip
-      FROM crop_pollution_best p
-      JOIN crop_temp_best t ON p.crop = t.crop AND t.rank = 1
-      JOIN crop_precip_best r ON p.crop = r.crop AND r.rank = 1
-      WHERE p.rank = 1
-      ORDER BY p.crop;
-  `;
-
-  connection.query(query, (err, data) => {
+  connection.query(queries.query3, (err, data) => {
     if (err) {
       console.log(err);
+      res.locals.skipCache = true;
       res.json({});
     } else {
       res.json(data.rows);
@@ -307,25 +119,11 @@ const bestConditionsByCrop = async function(req, res) {
 };
 
 const cropTrends = async function(req, res) {
-  connection.query(`
-    SELECT
-        c.year,
-        c.state,
-        ROUND(c.avg_yield::numeric, 2) AS avg_yield,
-        ROUND(p.avg_co::numeric, 4) AS avg_co,
-        ROUND(p.avg_no2::numeric, 4) AS avg_no2,
-        ROUND(p.avg_so2::numeric, 4) AS avg_so2,
-        ROUND(p.avg_o3::numeric, 4) AS avg_o3,
-        ROUND(w.avg_precipitation::numeric, 2) AS avg_precipitation,
-        ROUND(t.avg_temp::numeric, 2) AS avg_temp
-      FROM crop_yearly_mv c
-      LEFT JOIN pollution_yearly_mv p ON c.year = p.year AND c.state = p.state
-      LEFT JOIN precip_yearly_mv w ON c.year = w.year AND c.state = w.state
-      LEFT JOIN temperature_yearly_mv t ON c.year = t.year AND c.state = t.state
-      ORDER BY c.state, c.year;`,
+  connection.query(queries.query2,
     (err, data) => {
       if (err) {
         console.log(err);
+        res.locals.skipCache = true;
         res.json({});
       } else {
         res.json(data.rows);
@@ -335,52 +133,10 @@ const cropTrends = async function(req, res) {
 };
 
 const bestClimateResilientCrops = async function(req, res) {
-  connection.query(`
-    WITH crop_env AS (
-        SELECT
-          c.crop,
-          c.yield_kg_per_acre,
-          p.pollution,
-          t.average_temp,
-          y.avg_precip
-        FROM crop_data c
-        LEFT JOIN pollution_avg_by_year_state_mv p ON c.year = p.year AND UPPER(c.state) = p.state
-        LEFT JOIN temperature_avg_by_year_state_mv t ON c.year = t.year AND UPPER(c.state) = t.state
-        LEFT JOIN precip_avg_by_year_state_mv y ON c.year = y.year AND UPPER(c.state) = y.state
-        WHERE c.year BETWEEN 2016 AND 2022
-      ),
-      classified AS (
-        SELECT
-          crop,
-          yield_kg_per_acre,
-          CASE
-            WHEN pollution > 16 THEN 1 ELSE 0
-          END +
-          CASE
-            WHEN average_temp < 20 OR average_temp > 80 THEN 1 ELSE 0
-          END +
-          CASE
-            WHEN avg_precip <= 0.01 OR avg_precip > 0.16 THEN 1 ELSE 0
-          END AS extreme_score
-        FROM crop_env
-      ),
-      crop_resilience AS (
-        SELECT
-          crop,
-          AVG(yield_kg_per_acre) FILTER (WHERE extreme_score >= 2) AS avg_yield_in_extremes
-        FROM classified
-        GROUP BY crop
-        HAVING COUNT(*) FILTER (WHERE extreme_score >= 2) > 1
-      )
-
-      SELECT
-        crop,
-        ROUND(avg_yield_in_extremes::numeric, 2) AS avg_yield_in_extremes
-      FROM crop_resilience
-      ORDER BY avg_yield_in_extremes DESC;
-  `, (err, data) => {
+  connection.query(queries.query4, (err, data) => {
     if (err) {
       console.log(err);
+      res.locals.skipCache = true;
       res.json({});
     } else {
       res.json(data.rows);
@@ -389,30 +145,10 @@ const bestClimateResilientCrops = async function(req, res) {
 };
 
 const bestCropBySeason = async function (req, res) {
-  connection.query(`
-    WITH crop_season_yields AS (
-      SELECT
-        season,
-        crop,
-        AVG(yield_kg_per_acre) AS avg_yield,
-        ROW_NUMBER() OVER (
-          PARTITION BY season
-          ORDER BY AVG(yield_kg_per_acre) DESC
-        ) AS rank
-      FROM crop_data
-      WHERE season IS NOT NULL
-      GROUP BY season, crop
-    )
-    SELECT
-      season,
-      crop AS best_crop,
-      ROUND(avg_yield::numeric, 2) AS avg_yield_kg_per_acre
-    FROM crop_season_yields
-    WHERE rank = 1
-    ORDER BY season;
-  `, (err, data) => {
+  connection.query(queries.query9, (err, data) => {
     if (err) {
       console.log(err);
+      res.locals.skipCache = true;
       res.json({});
     } else {
       res.json(data.rows);
@@ -421,31 +157,92 @@ const bestCropBySeason = async function (req, res) {
 };
 
 const bestSeasonForCrop = async function (req, res) {
+  connection.query(queries.query10, (err, data) => {
+    if (err) {
+      console.log(err);
+      res.locals.skipCache = true;
+      res.json({});
+    } else {
+      res.json(data.rows);
+    }
+  });
+};
+
+const cropEnvelope = async function (req, res) {
+  // crop_envelope is rebuilt by the Python loader from queries 5-8
   connection.query(`
-    WITH crop_season_yields AS (
-      SELECT
-        crop,
-        season,
-        AVG(yield_kg_per_acre) AS avg_yield,
-        ROW_NUMBER() OVER (
-          PARTITION BY crop
-          ORDER BY AVG(yield_kg_per_acre) DESC
-        ) AS rank
-      FROM crop_data
-      WHERE season IS NOT NULL
-      GROUP BY crop, season
-    )
     SELECT
       crop,
-      season AS best_season_to_plant,
-      ROUND(avg_yield::numeric, 2) AS avg_yield_kg_per_acre
-    FROM crop_season_yields
-    WHERE rank = 1
+      best_region,
+      avg_yield,
+      min_temp_f,
+      max_temp_f,
+      min_precip_mm,
+      max_precip_mm,
+      min_pollution_index,
+      max_pollution_index
+    FROM crop_envelope
     ORDER BY crop;
   `, (err, data) => {
     if (err) {
       console.log(err);
-      res.json({});
+      res.locals.skipCache = true;
+      res.json([]);
+    } else {
+      res.json(data.rows);
+    }
+  });
+};
+
+// /search query parameter -> predicate on crop_envelope (each column is indexed)
+const SEARCH_FILTERS = {
+  region: 'best_region =',
+  temp_min: 'min_temp_f >=',
+  temp_max: 'max_temp_f <=',
+  precip_min: 'min_precip_mm >=',
+  precip_max: 'max_precip_mm <=',
+  pollution_min: 'min_pollution_index >=',
+  pollution_max: 'max_pollution_index <=',
+};
+
+const searchCrops = async function (req, res) {
+  // Only the filters actually given become predicates, so the planner can use
+  // their indexes; a crop without a range never passes a filter on it
+  const clauses = [];
+  const values = [];
+  for (const [name, predicate] of Object.entries(SEARCH_FILTERS)) {
+    const raw = req.query[name];
+    if (raw === undefined || raw === '') {
+      continue;
+    }
+    const value = name === 'region' ? String(raw) : Number(raw);
+    if (Number.isNaN(value)) {
+      res.locals.skipCache = true;
+      return res.status(400).json({ error: `${name} must be a number` });
+    }
+    values.push(value);
+    clauses.push(`${predicate} $${values.length}`);
+  }
+
+  connection.query(`
+    SELECT
+      crop,
+      best_region,
+      avg_yield,
+      min_temp_f,
+      max_temp_f,
+      min_precip_mm,
+      max_precip_mm,
+      min_pollution_index,
+      max_pollution_index
+    FROM crop_envelope
+    ${clauses.length ? `WHERE ${clauses.join('\n      AND ')}` : ''}
+    ORDER BY crop;
+  `, values, (err, data) => {
+    if (err) {
+      console.log(err);
+      res.locals.skipCache = true;
+      res.json([]);
     } else {
       res.json(data.rows);
     }
@@ -457,6 +254,8 @@ const bestSeasonForCrop = async function (req, res) {
 
 
 module.exports = {
+  // The pool's settings, for the data version listener in cache.js
+  connectionConfig: connection.options,
   hello,
   mapPage,
   getStateAverages,
@@ -468,5 +267,7 @@ module.exports = {
   cropTrends,
   bestClimateResilientCrops,
   bestCropBySeason,
-  bestSeasonForCrop
+  bestSeasonForCrop,
+  cropEnvelope,
+  searchCrops
 };
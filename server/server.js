@@ -1,29 +1,49 @@
+const path = require('path');
 const express = require('express');
 const cors = require('cors');
 const config = require('./config');
 const routes = require('./routes');
+const { ResponseCache, watchDataVersion } = require('./cache');
+const { SnapshotStore } = require('./snapshots');
 
 const app = express();
 app.use(cors({
   origin: '*',
 }));
 
+// Responses only change when the Python loader publishes a new data version
+const cache = new ResponseCache({
+  maxEntries: config.cache_max_entries,
+  ttlMs: config.cache_ttl_seconds && config.cache_ttl_seconds * 1000,
+});
+watchDataVersion(cache, routes.connectionConfig);
+const cached = cache.middleware();
+
+// Parameterless routes are served from the loader's exported snapshots when they
+// match the current data version
+const snapshots = new SnapshotStore(path.resolve(__dirname, config.snapshot_dir || 'snapshots'),
+  () => cache.version);
+snapshots.watch();
+const snapshot = snapshots.middleware();
+
 // Root
 app.get('/', routes.hello);
 // New routes for project MS4
 app.get('/map', routes.mapPage);
 
-app.get('/state/:state', routes.getStateAverages);
-
-app.get('/best-region-by-crop', routes.bestRegionForCrop);
-app.get('/best-temp-range-by-crop', routes.bestTemperatureRange);
-app.get('/best-precip-range-by-crop', routes.bestPrecipitationRange);
-app.get('/best-pollution-range-by-crop', routes.bestPollutionRange);
-app.get('/best-conditions', routes.bestConditionsByCrop);
-app.get('/crop-trends', routes.cropTrends);
-app.get('/best-climate-resilient-crops', routes.bestClimateResilientCrops);
-app.get('/best-crop-by-season', routes.bestCropBySeason);
-app.get('/best-season-for-crop', routes.bestSeasonForCrop);
+app.get('/state/:state', cached, routes.getStateAverages);
+
+app.get('/best-region-by-crop', snapshot, cached, routes.bestRegionForCrop);
+app.get('/best-temp-range-by-crop', snapshot, cached, routes.bestTemperatureRange);
+app.get('/best-precip-range-by-crop', snapshot, cached, routes.bestPrecipitationRange);
+app.get('/best-pollution-range-by-crop', snapshot, cached, routes.bestPollutionRange);
+app.get('/best-conditions', snapshot, cached, routes.bestConditionsByCrop);
+app.get('/crop-trends', snapshot, cached, routes.cropTrends);
+app.get('/best-climate-resilient-crops', snapshot, cached, routes.bestClimateResilientCrops);
+app.get('/best-crop-by-season', snapshot, cached, routes.bestCropBySeason);
+app.get('/best-season-for-crop', snapshot, cached, routes.bestSeasonForCrop);
+app.get('/crop-envelope', snapshot, cached, routes.cropEnvelope);
+app.get('/search', cached, routes.searchCrops);
 
 
 app.use((req, res, next) => {
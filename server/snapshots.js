@@ -0,0 +1,97 @@
+const fs = require('fs');
+const path = require('path');
+
+// Must match MANIFEST in harvest_match/snapshots.py
+const MANIFEST = 'manifest.json';
+const WATCH_INTERVAL_MS = 2000;
+// Preferred first when the client accepts several
+const ENCODINGS = ['br', 'gzip', 'identity'];
+
+/**
+ * Static JSON snapshots exported by the Python loader
+ * (python -m harvest_match --snapshot-dir DIR), held in memory.
+ * Each entry keeps the precompressed bodies, so a request is a lookup plus
+ * picking the encoding; routes without a snapshot fall through to the database.
+ * currentVersion() returns the data version the database last announced; a
+ * snapshot set written for any other version (e.g. a later load ran without
+ * --snapshot-dir) is not served.
+ */
+class SnapshotStore {
+  constructor(dir, currentVersion) {
+    this.dir = dir;
+    this.currentVersion = currentVersion;
+    this.version = null;
+    this.snapshots = new Map();
+  }
+
+  load() {
+    let manifest;
+    try {
+      manifest = JSON.parse(fs.readFileSync(path.join(this.dir, MANIFEST), 'utf8'));
+    } catch (err) {
+      if (err.code !== 'ENOENT') {
+        console.log(err);
+      }
+      this.version = null;
+      this.snapshots = new Map();
+      return;
+    }
+    if (manifest.version === this.version) {
+      return;
+    }
+    try {
+      const snapshots = new Map();
+      for (const [route, entry] of Object.entries(manifest.snapshots)) {
+        const bodies = { identity: fs.readFileSync(path.join(this.dir, entry.file)) };
+        for (const [encoding, file] of Object.entries(entry.encodings)) {
+          bodies[encoding] = fs.readFileSync(path.join(this.dir, file));
+        }
+        snapshots.set(route, { etag: entry.etag, bodies });
+      }
+      // Swap in the whole set at once, never a mix of two versions
+      this.snapshots = snapshots;
+      this.version = manifest.version;
+      console.log(`Loaded ${snapshots.size} snapshots (data version ${this.version})`);
+    } catch (err) {
+      // Keep serving the previous set; the next manifest change retries
+      console.log(err);
+    }
+  }
+
+  // Load now and again whenever the loader replaces the manifest
+  watch() {
+    this.load();
+    fs.watchFile(path.join(this.dir, MANIFEST), { interval: WATCH_INTERVAL_MS }, () => this.load());
+  }
+
+  // Express middleware: answer from the snapshot for this route, if there is one
+  middleware() {
+    return (req, res, next) => {
+      // A snapshot is the unfiltered response; requests with parameters go to the route
+      const snapshot = Object.keys(req.query).length ? undefined : this.snapshots.get(req.path);
+      if (!snapshot || this.version !== this.currentVersion()) {
+        return next();
+      }
+      res.set({
+        'Content-Type': 'application/json; charset=utf-8',
+        'ETag': snapshot.etag,
+        'Vary': 'Accept-Encoding',
+        'X-Snapshot': this.version,
+      });
+      if (req.fresh) {
+        return res.status(304).end();
+      }
+      const encoding = req.acceptsEncodings(ENCODINGS.filter((e) => snapshot.bodies[e])) || 'identity';
+      const body = snapshot.bodies[encoding];
+      if (encoding !== 'identity') {
+        res.set('Content-Encoding', encoding);
+      }
+      res.set('Content-Length', body.length);
+      res.end(body);
+    };
+  }
+}
+
+module.exports = {
+  SnapshotStore,
+};
@@ -0,0 +1,97 @@
+import datetime
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from harvest_match.bulk_load import (
+    BINARY_HEADER, BINARY_TRAILER, PG_EPOCH, TABLES, _binary_buffer, partition_years,
+)
+from harvest_match.synthetic import synthetic_frames
+
+DECODERS = {
+    'BIGINT': lambda b: struct.unpack('!q', b)[0],
+    'INTEGER': lambda b: struct.unpack('!i', b)[0],
+    'SMALLINT': lambda b: struct.unpack('!h', b)[0],
+    'DOUBLE PRECISION': lambda b: struct.unpack('!d', b)[0],
+    'REAL': lambda b: struct.unpack('!f', b)[0],
+    'DATE': lambda b: PG_EPOCH + datetime.timedelta(days=struct.unpack('!i', b)[0]),
+    'TEXT': lambda b: b.decode('utf-8'),
+}
+
+
+def decode(data, types):
+    """Rows of a COPY BINARY stream, NULL as None."""
+    assert data.startswith(BINARY_HEADER) and data.endswith(BINARY_TRAILER)
+    pos, end = len(BINARY_HEADER), len(data) - len(BINARY_TRAILER)
+    rows = []
+    while pos < end:
+        (count,), pos = struct.unpack_from('!h', data, pos), pos + 2
+        assert count == len(types)
+        row = []
+        for pg_type in types:
+            (length,), pos = struct.unpack_from('!i', data, pos), pos + 4
+            if length == -1:
+                row.append(None)
+                continue
+            row.append(DECODERS[pg_type](data[pos:pos + length]))
+            pos += length
+        rows.append(row)
+    assert pos == end
+    return rows
+
+
+def test_binary_round_trip_with_nulls():
+    types = {'n': 'BIGINT', 'small': 'SMALLINT', 'x': 'DOUBLE PRECISION', 'day': 'DATE',
+             'name': 'TEXT', 'kind': 'TEXT'}
+    df = pd.DataFrame({
+        'n': pd.array([1, None, -(2 ** 40)], dtype='Int64'),
+        'small': pd.array([7, 8, None], dtype='Int16'),
+        'x': [0.1, np.nan, -2.5],
+        'day': [datetime.date(2016, 2, 29), None, datetime.date(1999, 12, 31)],
+        'name': ['crème brûlée', '', None],
+        'kind': pd.Categorical(['Rain', None, 'Snow']),
+    })
+    assert decode(_binary_buffer(df, types).getvalue(), list(types.values())) == [
+        [1, 7, 0.1, datetime.date(2016, 2, 29), 'crème brûlée', 'Rain'],
+        [None, 8, None, None, '', None],
+        [-(2 ** 40), None, -2.5, datetime.date(1999, 12, 31), None, 'Snow'],
+    ]
+
+
+def test_binary_spans_blocks(monkeypatch):
+    monkeypatch.setattr('harvest_match.bulk_load.BINARY_BLOCK_ROWS', 3)
+    df = pd.DataFrame({'n': range(10), 'name': [f'row {i}' for i in range(10)]})
+    rows = decode(_binary_buffer(df, {'n': 'BIGINT', 'name': 'TEXT'}).getvalue(), ['BIGINT', 'TEXT'])
+    assert rows == [[i, f'row {i}'] for i in range(10)]
+
+
+def test_binary_empty_frame():
+    df = pd.DataFrame({'n': pd.Series([], dtype='int64')})
+    assert _binary_buffer(df, {'n': 'BIGINT'}).getvalue() == BINARY_HEADER + BINARY_TRAILER
+
+
+@pytest.mark.parametrize('table', list(TABLES))
+def test_binary_encodes_every_loaded_table(table):
+    types = TABLES[table]
+    df = next(iter(synthetic_frames(table)))[list(types)].head(500)
+    rows = decode(_binary_buffer(df, types).getvalue(), list(types.values()))
+    assert len(rows) == len(df)
+    for (column, pg_type), decoded in zip(types.items(), zip(*rows)):
+        expected = df[column].astype(object).where(df[column].notna(), None).tolist()
+        if pg_type == 'DATE':
+            expected = [None if v is None else pd.Timestamp(v).date() for v in expected]
+        elif pg_type == 'TEXT':
+            expected = [None if v is None else str(v) for v in expected]
+        assert list(decoded) == expected, column
+
+
+def test_binary_rejects_unknown_types():
+    with pytest.raises(ValueError, match='NUMERIC'):
+        _binary_buffer(pd.DataFrame({'x': [1.5]}), {'x': 'NUMERIC'})
+
+
+def test_partition_years_of_dates():
+    df = pd.DataFrame({'start_date': [datetime.date(2018, 5, 1), None, datetime.date(2016, 1, 1)]})
+    assert partition_years('weather_events', df) == [2016, 2018]
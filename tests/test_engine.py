@@ -0,0 +1,171 @@
+import decimal
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from harvest_match.bulk_load import TABLES
+from harvest_match.engine import (
+    EXTREMES, REGIONS, TREND_YEARS, AnalyticsEngine, Extremes, _differences, pg_round, tercile,
+    tercile_cuts,
+)
+from harvest_match.facts import CLIMATE_YEARS
+from harvest_match.synthetic import synthetic_frames
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return {table: list(synthetic_frames(table)) for table in TABLES}
+
+
+@pytest.fixture(scope='module')
+def engine(frames):
+    return AnalyticsEngine.from_frames(frames)
+
+
+@pytest.fixture(scope='module')
+def crops(frames):
+    df = pd.concat(frames['crop_data'], ignore_index=True)
+    return df.astype({'state': object, 'crop': object, 'season': object})
+
+
+def best_by(df, group, column, names):
+    """``ROW_NUMBER() OVER (PARTITION BY group ORDER BY AVG(yield) DESC) = 1`` in pandas."""
+    means = df.groupby([group, column])['yield_kg_per_acre'].mean().reset_index()
+    best = means.loc[means.groupby(group)['yield_kg_per_acre'].idxmax()]
+    return [{names[0]: row[group], names[1]: row[column], names[2]: pg_round(row['yield_kg_per_acre'], 2)}
+            for _, row in best.iterrows()]
+
+
+def test_pg_round_matches_numeric_rounding():
+    assert pg_round(2.675, 2) == decimal.Decimal('2.68')
+    assert pg_round(-0.125, 2) == decimal.Decimal('-0.13')
+    assert pg_round(1e-20, 4) == decimal.Decimal('0.0000')
+    assert pg_round(float('nan'), 2) is None
+    assert pg_round(None, 2) is None
+
+
+def test_differences_allow_one_unit_in_the_last_place():
+    expected = [{'crop': 'CORN', 'avg_yield': decimal.Decimal('1.23')}]
+    assert _differences('q', expected, [{'crop': 'CORN', 'avg_yield': decimal.Decimal('1.24')}]) == []
+    assert len(_differences('q', expected, [{'crop': 'CORN', 'avg_yield': decimal.Decimal('1.25')}])) == 1
+    assert _differences('q', expected, []) == ['q: 1 rows from SQL, 0 from the engine']
+
+
+def test_every_query_answers(engine):
+    for name in engine.results:
+        assert engine.query(name), name
+    assert engine.query('query1', 'iowa')[0]['state'] == 'IOWA'
+    assert engine.query('query1', 'ATLANTIS') == []
+
+
+def test_crop_trends_match_pandas(engine, crops):
+    window = crops[crops['year'].between(*TREND_YEARS)]
+    means = window.groupby(['year', 'state'])['yield_kg_per_acre'].mean()
+    expected = [{'year': int(year), 'state': state, 'avg_yield': pg_round(value, 2)}
+                for (year, state), value in means.items()]
+    actual = [{key: row[key] for key in ('year', 'state', 'avg_yield')} for row in engine.query('query2')]
+    assert _differences('query2', expected, actual) == []
+
+
+def test_best_regions_match_pandas(engine, crops):
+    expected = best_by(crops.assign(region=crops['state'].map(REGIONS)), 'crop', 'region',
+                       ('crop', 'best_region', 'avg_yield'))
+    assert _differences('query6', expected, engine.query('query6')) == []
+
+
+def test_best_seasons_match_pandas(engine, crops):
+    seasons = crops[crops['season'].notna()]
+    assert _differences('query9', best_by(seasons, 'season', 'crop',
+                                          ('season', 'best_crop', 'avg_yield_kg_per_acre')),
+                        engine.query('query9')) == []
+    assert _differences('query10', best_by(seasons, 'crop', 'season',
+                                           ('crop', 'best_season_to_plant', 'avg_yield_kg_per_acre')),
+                        engine.query('query10')) == []
+
+
+def brute_ntile(values, weights, buckets=3):
+    """Each value's ``NTILE`` bucket over its rows repeated ``weights`` times, NULL last.
+
+    Rows of one value split across a cut count in the upper bucket, as
+    ``tercile`` assigns them.
+    """
+    order = sorted((v for v, w in zip(values, weights) for _ in range(w)),
+                   key=lambda v: (np.isnan(v), v))
+    size, extra = divmod(len(order), buckets)
+    bucket, upper = 0, {}
+    for row, value in enumerate(order):
+        if row == (bucket + 1) * size + min(bucket + 1, extra):
+            bucket += 1
+        upper['nan' if np.isnan(value) else value] = bucket
+    return upper
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_tercile_cuts_match_ntile(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 30))
+    # Few distinct values so ties straddle cuts; some readings join no rows
+    values = rng.integers(0, 8, n).astype('float64')
+    values[rng.random(n) < 0.1] = np.nan
+    weights = rng.integers(0, 5, n)
+
+    expected = brute_ntile(values, weights)
+    buckets = tercile(values, tercile_cuts(values, weights))
+    actual = {'nan' if np.isnan(v) else v: b for v, b, w in zip(values, buckets, weights) if w > 0}
+    assert actual == expected
+
+
+def test_empty_frames_give_empty_results():
+    engine = AnalyticsEngine.from_frames({})
+    assert all(rows == [] for rows in engine.results.values())
+    assert np.all(engine.extreme_scores() == 0)
+
+
+@pytest.fixture(scope='module')
+def crop_climate(frames, crops):
+    """Crop rows of the climate years joined to their (year, state) readings, computed in pandas."""
+    def by_cell(table, year, state, columns):
+        df = pd.concat(frames[table], ignore_index=True)
+        keys = [pd.to_datetime(df[year]).dt.year if table == 'weather_events' else df[year],
+                df[state].astype(str).str.upper()]
+        means = df[columns].astype('float64').groupby(keys).mean()
+        means.index.names = ['year', 'state']
+        return means
+
+    pollution = by_cell('pollution_data', 'Year', 'State',
+                        [f'{p} Mean' for p in ('CO', 'NO2', 'SO2', 'O3')]).sum(axis=1).rename('pollution')
+    temp = by_cell('temperature_data', 'year', 'state', ['average_temp'])['average_temp'].rename('temp')
+    precip = by_cell('weather_events', 'start_date', 'state', ['precipitation'])['precipitation'].rename('precip')
+    rows = crops[crops['year'].between(*CLIMATE_YEARS)].astype({'year': 'int64'})
+    return rows.join(pd.concat([pollution, temp, precip], axis=1), on=['year', 'state'])
+
+
+def brute_resilient(rows, extremes):
+    """Query 4 over the joined rows: NULL readings score nothing."""
+    score = ((rows['pollution'] > extremes.pollution).astype(int)
+             + ((rows['temp'] < extremes.temp[0]) | (rows['temp'] > extremes.temp[1]))
+             + ((rows['precip'] <= extremes.precip[0]) | (rows['precip'] > extremes.precip[1])))
+    grouped = rows[score >= extremes.min_score].groupby('crop')['yield_kg_per_acre']
+    means = grouped.mean()[grouped.count() > 1].sort_values(ascending=False)
+    return [{'crop': crop, 'avg_yield_in_extremes': pg_round(mean, 2)} for crop, mean in means.items()]
+
+
+SWEEP = [Extremes(pollution, temp, precip, min_score)
+         for pollution, temp, precip, min_score in itertools.product(
+             (10, 12, EXTREMES.pollution), ((45, 60), EXTREMES.temp),
+             ((0.1, 0.12), EXTREMES.precip), (1, 2, 3))]
+
+
+@pytest.mark.parametrize('extremes', SWEEP)
+def test_resilient_crops_match_a_row_scan(engine, crop_climate, extremes):
+    expected = brute_resilient(crop_climate, extremes)
+    actual = engine.resilient_crops(extremes)
+    assert _differences('query4', expected, actual) == []
+    assert [row['crop'] for row in actual] == [row['crop'] for row in expected]
+
+
+def test_default_thresholds_rank_crops(engine):
+    assert engine.query('query4') == engine.resilient_crops(EXTREMES)
+    assert engine.query('query4')
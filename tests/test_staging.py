@@ -0,0 +1,79 @@
+import dataclasses
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from harvest_match import staging  # noqa: E402
+from harvest_match.bulk_load import TABLES  # noqa: E402
+from harvest_match.datasets import DATASETS, clean_temperature, extract_transform  # noqa: E402
+from harvest_match.synthetic import TEMPERATURE_STATES, TEMPERATURE_YEARS, TITLE_NAMES  # noqa: E402
+
+TEMPERATURE = DATASETS['temperature']
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """A raw temperature file with more (year, state) pairs than pyarrow's default 1024 partitions."""
+    states = TITLE_NAMES[TEMPERATURE_STATES]
+    years = range(*TEMPERATURE_YEARS)
+    df = pd.DataFrame([(state, year, month, 50.0 + month, 51.0, -90.0, 40.0)
+                       for state in states for year in years for month in (1, 7)],
+                      columns=['state', 'year', 'month', 'average_temp',
+                               'monthly_mean_from_1901_to_2000', 'centroid_lon', 'centroid_lat'])
+    df.to_csv(tmp_path / TEMPERATURE.filename)
+    return tmp_path
+
+
+def table_rows(frames):
+    """Rows as comparable tuples, in a fixed order."""
+    df = pd.concat(list(frames), ignore_index=True)[list(TABLES[TEMPERATURE.table])]
+    return sorted(df.astype(object).itertuples(index=False, name=None))
+
+
+def test_partition_limit_counts_raw_years_and_states(raw_dir):
+    limit = staging.partition_limit(TEMPERATURE, raw_dir / TEMPERATURE.filename)
+    assert limit == len(TEMPERATURE_STATES) * len(range(*TEMPERATURE_YEARS))
+    assert limit > 1024
+
+
+def test_stage_round_trip(raw_dir, tmp_path):
+    cache = tmp_path / 'cache'
+    path = staging.ensure_stage(TEMPERATURE, raw_dir, cache)
+
+    assert staging.is_staged(path)
+    partitions = {os.path.relpath(root, path) for root, _, files in os.walk(path)
+                  if any(f.endswith('.parquet') for f in files)}
+    assert len(partitions) == len(TEMPERATURE_STATES) * len(range(*TEMPERATURE_YEARS))
+    assert all(p.startswith('stage_year=') and '/stage_state=' in p for p in partitions)
+    assert table_rows(staging.read_stage(TEMPERATURE, path)) == table_rows(extract_transform(TEMPERATURE, raw_dir))
+
+
+def test_stage_is_reused_until_the_source_changes(raw_dir, tmp_path, capsys):
+    cache = tmp_path / 'cache'
+    first = staging.ensure_stage(TEMPERATURE, raw_dir, cache)
+    rows = staging.staged_rows(first)
+    assert staging.ensure_stage(TEMPERATURE, raw_dir, cache) == first
+    assert 'staging cache hit' in capsys.readouterr().out
+
+    with open(raw_dir / TEMPERATURE.filename, 'a') as f:
+        f.write('9999,Iowa,2022,3,30.0,31.0,-93.0,42.0\n')
+    second = staging.ensure_stage(TEMPERATURE, raw_dir, cache)
+    assert second != first
+    assert not os.path.exists(first)
+    assert staging.staged_rows(second) == rows + 1
+
+
+def test_stage_key_follows_the_cleaning_code():
+    def clean_temperature_in_celsius(df):
+        out = clean_temperature(df)
+        out['average_temp'] = (out['average_temp'] - 32) / 1.8
+        return out
+
+    key = staging.stage_key(TEMPERATURE, 'digest')
+    assert staging.stage_key(TEMPERATURE, 'digest') == key
+    assert staging.stage_key(TEMPERATURE, 'other digest') != key
+    assert staging.stage_key(dataclasses.replace(TEMPERATURE, clean=clean_temperature_in_celsius),
+                             'digest') != key
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from harvest_match.bulk_load import TABLES
+from harvest_match.engine import EXTREMES, AnalyticsEngine
+from harvest_match.synthetic import BASE_ROWS, EXTREME_CELLS, synthetic_frames
+
+
+def frame(table, scale=1, seed=0):
+    return pd.concat(list(synthetic_frames(table, scale, seed)), ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return {table: list(synthetic_frames(table)) for table in TABLES}
+
+
+@pytest.mark.parametrize('table', list(TABLES))
+def test_same_seed_same_rows(frames, table):
+    assert frame(table).equals(pd.concat(frames[table], ignore_index=True))
+
+
+@pytest.mark.parametrize('table', list(TABLES))
+def test_seed_changes_rows(frames, table):
+    assert not frame(table, seed=1).equals(pd.concat(frames[table], ignore_index=True))
+
+
+@pytest.mark.parametrize('table', list(TABLES))
+def test_frames_have_the_table_columns(frames, table):
+    for df in frames[table]:
+        assert set(df.columns) == set(TABLES[table])
+    if table in BASE_ROWS:
+        assert sum(len(df) for df in frames[table]) == BASE_ROWS[table]
+
+
+def test_extreme_cells_score_at_the_default_thresholds(frames):
+    engine = AnalyticsEngine.from_frames(frames)
+    scores = engine.extreme_scores()
+    states = list(engine.states)
+    for state, year in EXTREME_CELLS:
+        assert scores[year - engine.first_year, states.index(state)] >= EXTREMES.min_score
+    assert engine.resilient_crops()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from harvest_match.transforms import (
+    BUSHEL_KG, UNIT_CONVERSIONS, normalize_state, season_from_month, season_from_month_abbr,
+    yield_kg_per_acre,
+)
+
+
+def rowwise_yield(value, unit, crop):
+    """The per-row conversion the vectorized one replaced."""
+    try:
+        value = float(value)
+    except ValueError:
+        return np.nan
+    if unit == 'BU / ACRE':
+        return value * BUSHEL_KG.get(crop, UNIT_CONVERSIONS['BU / ACRE'])
+    return value * UNIT_CONVERSIONS.get(unit, np.nan)
+
+
+def test_yield_matches_rowwise_conversion():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    crop = rng.choice(['CORN', 'OATS', 'SOYBEANS', 'HAY', 'COTTON', 'SUNFLOWER'], n)
+    unit = rng.choice(['BU / ACRE', 'TONS / ACRE', 'LB / ACRE', 'CWT / ACRE'], n)
+    value = rng.uniform(1, 3000, n).round(1).astype(str).astype(object)
+    value[rng.random(n) < 0.05] = '(D)'
+
+    actual = yield_kg_per_acre(pd.Series(value), pd.Series(unit), pd.Series(crop))
+    expected = [rowwise_yield(v, u, c) for v, u, c in zip(value, unit, crop)]
+    np.testing.assert_allclose(actual.to_numpy(), expected, rtol=1e-12)
+
+
+def test_bushels_use_the_crop_test_weight():
+    crop = pd.Series(['CORN', 'OATS', 'QUINOA'])
+    actual = yield_kg_per_acre(pd.Series(['1', '1', '1']), pd.Series(['BU / ACRE'] * 3), crop)
+    assert actual.tolist() == pytest.approx([56 * 0.45359237, 32 * 0.45359237, UNIT_CONVERSIONS['BU / ACRE']])
+
+
+def test_unknown_units_and_suppressed_values_are_nan():
+    actual = yield_kg_per_acre(pd.Series(['10', '(D)', '10']),
+                               pd.Series(['CWT / ACRE', 'LB / ACRE', None]),
+                               pd.Series(['BEANS', 'COTTON', 'CORN']))
+    assert actual.isna().all()
+
+
+def test_normalize_state_reads_leading_codes():
+    actual = normalize_state(pd.Series(['CO', 'CO ', 'ny', 'XX', None]))
+    assert actual.tolist()[:2] == ['Colorado', 'Colorado']
+    assert actual.isna().tolist()[2:] == [True, True, True]
+
+
+def test_seasons_share_one_dtype():
+    by_number = season_from_month(pd.Series([12, 3, 7, 10]))
+    by_abbr = season_from_month_abbr(pd.Series(['Dec', 'Mar', 'Jul', 'Oct']))
+    assert by_number.tolist() == ['Winter', 'Spring', 'Summer', 'Fall']
+    assert by_number.dtype == by_abbr.dtype
+    pd.testing.assert_series_equal(by_number, by_abbr)